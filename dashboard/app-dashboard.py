@@ -1,8 +1,10 @@
 import streamlit as st
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
 from pathlib import Path
-import plotly.express as px
-import re
 import re
 
 # Título (corrigido colchete e acentuação)
@@ -10,56 +12,120 @@ st.title(":blue[Análise de Cotações Cambiais]")
 
 BASE_DIR = Path(__file__).resolve().parents[1]  # volta para raiz do projeto
 GOLD_DIR = BASE_DIR / "data" / "gold"
+# Colunas lidas do parquet por padrão (date é derivada do nome do arquivo);
+# painéis que precisem de mais colunas passam `colunas` para load_data
+GOLD_COLUMNS = ("target_currency", "latest_rate")
+
+# Padrões compilados uma única vez (data no nome do arquivo e blocos da explicação LLM)
+_DATE_RE = re.compile(r'(\d{4}-\d{2}-\d{2})')
+_BLOCK_SPLIT_RE = re.compile(r'(?m)^(?=\d+\.\s+\*\*)')
+_CURR_RE = re.compile(r'\*\*(\w{3})\s')
 
-@st.cache_data(show_spinner=True)
-def load_data(pasta: Path) -> pd.DataFrame:
+def dir_mtime(pasta: Path) -> float:
+	"""mtime do diretório (0.0 se não existir), usado como chave dos caches abaixo."""
+	try:
+		return pasta.stat().st_mtime
+	except FileNotFoundError:
+		return 0.0
+
+# Duas listagens (parquet e insights) por mtime vigente; mtimes antigos são descartados
+@st.cache_data(show_spinner=False, max_entries=4)
+def list_gold_files(pasta: Path, padrao: str, mtime: float) -> list[Path]:
+	"""Lista arquivos da pasta; só refaz o glob quando o mtime do diretório muda."""
+	return sorted(pasta.glob(padrao))
+
+# cache_resource: o DataFrame é compartilhado entre sessões sem pickle/unpickle a cada rerun.
+# Por isso o resultado deve ser tratado como somente leitura (use assign/cópias para alterar).
+# Só a versão mais recente do histórico gold fica em memória
+@st.cache_resource(show_spinner=True, max_entries=1)
+def load_data(pasta: Path, mtime: float, colunas: tuple = GOLD_COLUMNS) -> pd.DataFrame:
 	if not pasta.exists():
 		st.warning(f"Pasta não encontrada: {pasta}")
 		return pd.DataFrame()
 
-	# Usa glob do pathlib (mais simples) / fallback glob para padrão string
-	arquivos = sorted(pasta.glob("*.parquet"))
+	arquivos = list_gold_files(pasta, "*.parquet", mtime)
 	if not arquivos:
 		st.info("Nenhum arquivo parquet encontrado em data/gold.")
 		return pd.DataFrame()
 
-	dfs = []
-	date_pattern = re.compile(r'(\d{4}-\d{2}-\d{2})')
-	for f in arquivos:
-		try:
-			file_date_match = date_pattern.search(f.name)
-			file_date = file_date_match.group(1) if file_date_match else None
-			tmp = pd.read_parquet(f)
-			# Força a coluna date a vir do nome do arquivo
-			if file_date:
-				try:
-					tmp['date'] = pd.to_datetime(file_date)
-				except Exception:
-					tmp['date'] = file_date
-			tmp["file_date_str"] = file_date
-			tmp["source_file"] = f.name
-			dfs.append(tmp)
-		except Exception as e:
-			st.error(f"Erro ao ler {f.name}: {e}")
-
-	if not dfs:
+	# Scan único via pyarrow.dataset: lê apenas as colunas usadas e evita N leituras + concat
+	try:
+		dataset = ds.dataset([str(f) for f in arquivos], format="parquet")
+		batches, nomes, linhas = [], [], []
+		for tagged in dataset.scanner(columns=list(colunas)).scan_batches():
+			batches.append(tagged.record_batch)
+			nomes.append(Path(tagged.fragment.path).name)
+			linhas.append(tagged.record_batch.num_rows)
+		table = pa.Table.from_batches(batches, schema=pa.schema([dataset.schema.field(c) for c in colunas]))
+	except Exception as e:
+		st.error(f"Erro ao ler arquivos parquet: {e}")
 		return pd.DataFrame()
 
-	df = pd.concat(dfs, ignore_index=True, sort=False)
+	if table.num_rows == 0:
+		return pd.DataFrame()
+
+	# split_blocks evita consolidar as colunas num bloco 2D (cópia extra); com um único
+	# arquivo as colunas numéricas são convertidas sem cópia
+	df = table.to_pandas(split_blocks=True)
+
+	# Um arquivo grande pode gerar vários batches: codifica cada batch pelo índice do seu arquivo
+	batch_file, nomes = pd.factorize(pd.Series(nomes, dtype=object))
+	# Força a coluna date a vir do nome do arquivo (extração e parse vetorizados, uma vez por arquivo)
+	datas = pd.Series(nomes, dtype=object).str.extract(_DATE_RE, expand=False)
+	file_dates = pd.to_datetime(datas, errors="coerce")
+	# Índice do arquivo de cada linha, calculado uma vez e reaproveitado pelas três colunas
+	file_idx = np.repeat(batch_file, linhas)
+	df["date"] = file_dates.to_numpy()[file_idx]
+	df["file_date_str"] = datas.to_numpy(dtype=object)[file_idx]
+	df["source_file"] = pd.Categorical.from_codes(file_idx, categories=nomes)
+	# Baixa cardinalidade: category reduz memória/tamanho do cache e acelera isin/groupby
+	df["target_currency"] = df["target_currency"].astype("category")
 	return df
 
-df = load_data(GOLD_DIR)
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_insight(arquivo: Path, mtime: float) -> dict:
+	"""Lê o JSON de insights LLM; mtime faz parte da chave do cache para invalidar quando o arquivo muda."""
+	with open(arquivo, 'rb') as f:
+		return orjson.loads(f.read())
+
+gold_mtime = dir_mtime(GOLD_DIR)
+df = load_data(GOLD_DIR, gold_mtime)
 
 if df.empty:
 	st.stop()
 
+# Importado só quando há dados para plotar (plotly é o import mais pesado do app)
+import plotly.graph_objects as go
+from plotly.colors import qualitative
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def build_fig(currencies: tuple, last_date, mtime: float, metric: str, _dados: pd.DataFrame) -> go.Figure:
+	"""Monta o gráfico de barras; cacheado por (moedas, última data, mtime da pasta gold)."""
+	# _dados fica fora da chave do cache (prefixo _): é determinado pelos demais argumentos
+	# go.Bar com arrays já ordenados: evita o agrupamento por cor/traces do plotly.express
+	sorted_df = _dados.sort_values(metric, ascending=False)
+	palette = qualitative.Plotly
+	fig = go.Figure(go.Bar(
+		x=sorted_df['target_currency'].to_numpy(dtype=object),
+		y=sorted_df[metric].to_numpy(),
+		marker_color=[palette[i % len(palette)] for i in range(len(sorted_df))],
+	))
+	fig.update_layout(
+		title=f'{metric} - comparação última data {last_date.date() if last_date else ""}',
+		xaxis_title='target_currency',
+		yaxis_title=metric,
+		uirevision='currencies',
+	)
+	return fig
+
 st.success(f"Registros carregados: {len(df):,}")
 
 possible_date_cols = [c for c in df.columns if 'date' in c.lower() or 'data' in c.lower()]
 date_col = possible_date_cols[0] if possible_date_cols else None
-if date_col:
+# A coluna date já chega como datetime64 de load_data; só converte se necessário
+if date_col and not pd.api.types.is_datetime64_any_dtype(df[date_col]):
 	try:
-		df[date_col] = pd.to_datetime(df[date_col])
+		df = df.assign(**{date_col: pd.to_datetime(df[date_col], errors='coerce')})
 	except Exception:
 		pass
 
@@ -78,30 +144,28 @@ if 'target_currency' not in df.columns or required_metric not in df.columns:
 	st.stop()
 
 # Seleção única ou múltipla de moedas (multiselect para permitir comparar algumas)
-all_currencies = sorted(df['target_currency'].unique())
+all_currencies = df['target_currency'].cat.categories.tolist()
 sel_currencies = st.multiselect(
 	'Moedas:', all_currencies, default=all_currencies[:5] if len(all_currencies) > 5 else all_currencies
 )
 if not sel_currencies:
 	st.info('Selecione ao menos uma moeda.'); st.stop()
 
-df = df[df['target_currency'].isin(sel_currencies)]
+# Máscara única de moedas e projeção só das colunas do gráfico: uma cópia por rerun
+currency_mask = df['target_currency'].isin(sel_currencies)
+plot_cols = ['target_currency', required_metric] + ([date_col] if date_col else [])
 
-# Última data
+# Última data de cada moeda (moedas podem ter datas mais recentes diferentes)
 if date_col:
-	last_date = df[date_col].max()
-	last_df = df[df[date_col] == last_date]
+	filtered = df.loc[currency_mask & df[date_col].notna(), plot_cols]
+	idx = filtered.groupby('target_currency', sort=False, observed=True)[date_col].idxmax()
+	last_df = filtered.loc[idx]
+	last_date = last_df[date_col].max() if not last_df.empty else None
 else:
-	last_df = df
+	last_df = df.loc[currency_mask, plot_cols]
 	last_date = None
 
-fig = px.bar(
-	last_df.sort_values(required_metric, ascending=False),
-	x='target_currency',
-	y=required_metric,
-	color='target_currency',
-	title=f'latest_rate - comparação última data {last_date.date() if last_date else ""}'
-)
+fig = build_fig(tuple(sel_currencies), last_date, gold_mtime, required_metric, last_df)
 st.plotly_chart(fig, use_container_width=True)
 
 # Exibe insights LLM (arquivo json da última data disponível em data/gold)
@@ -113,16 +177,14 @@ if last_date:
 		insight_file = candidate
 else:
 	# fallback: pega o mais recente
-	json_files = sorted(gold_dir.glob('llm_insights_*.json'))
+	json_files = list_gold_files(gold_dir, 'llm_insights_*.json', gold_mtime)
 	if json_files:
 		insight_file = json_files[-1]
 
 st.subheader('Insights LLM')
 if insight_file:
-	import json
 	try:
-		with open(insight_file, 'r', encoding='utf-8') as f:
-			data_insight = json.load(f)
+		data_insight = load_insight(insight_file, insight_file.stat().st_mtime)
 		st.caption(f"Fonte: {insight_file.name}")
 
 		# Mostra sempre o resumo executivo completo (se existir)
@@ -131,24 +193,13 @@ if insight_file:
 
 		def filtrar_explicacao(texto: str, moedas: list[str]) -> str:
 			"""Extrai somente blocos das moedas selecionadas do campo currency_explanation."""
-			# Divide por dupla que começa com número + ponto ou linha em branco
-			linhas = texto.splitlines()
-			blocos = []
-			bloco_atual = []
-			for ln in linhas:
-				if re.match(r'^\d+\.\s+\*\*', ln) and bloco_atual:
-					blocos.append('\n'.join(bloco_atual))
-					bloco_atual = [ln]
-				else:
-					bloco_atual.append(ln)
-			if bloco_atual:
-				blocos.append('\n'.join(bloco_atual))
-			selecionados = []
+			# Divide antes de cada linha que começa com número + ponto + negrito (um único re.split)
+			blocos = _BLOCK_SPLIT_RE.split(texto)
 			upper_set = {m.upper() for m in moedas}
-			for b in blocos:
-				m = re.search(r'\*\*(\w{3})\s', b)
-				if m and m.group(1).upper() in upper_set:
-					selecionados.append(b)
+			selecionados = [
+				b.removesuffix('\n') for b in blocos
+				if (m := _CURR_RE.search(b)) and m.group(1).upper() in upper_set
+			]
 			return '\n\n'.join(selecionados)
 
 		if 'currency_explanation' in data_insight:
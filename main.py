@@ -24,6 +24,7 @@ Exemplos de uso:
   python main.py --daily                    # Executa pipeline para hoje
   python main.py --daily --date 2024-01-15  # Executa para data específica
   python main.py --historical --start 2024-01-01 --end 2024-01-07  # Período histórico
+  python main.py --historical --batched --start 2024-01-01 --end 2024-01-07  # Backfill silver em lote
   python main.py --status                   # Verifica status do pipeline
         """
     )
@@ -62,6 +63,11 @@ Exemplos de uso:
         type=str,
         help='Data final para pipeline histórico (YYYY-MM-DD)'
     )
+    parser.add_argument(
+        '--batched',
+        action='store_true',
+        help='No pipeline histórico, grava apenas a silver histórica, um arquivo por mês (sem gold/LLM)'
+    )
     parser.add_argument(
         '--config',
         type=str,
@@ -74,6 +80,7 @@ Exemplos de uso:
     )
     
     args = parser.parse_args()
+    pipeline = None
     
     try:
         # Inicializa pipeline
@@ -102,7 +109,7 @@ Exemplos de uso:
             if 'data_paths' in status:
                 print("\nDiretórios de dados:")
                 for path_type, exists in status['data_paths'].items():
-                    print(f"   {path_type}: {'Sucesso' if exists == 'True' else 'Falha'}")
+                    print(f"   {path_type}: {'Sucesso' if exists else 'Falha'}")
             
         elif args.daily:
             # Pipeline diário
@@ -110,6 +117,11 @@ Exemplos de uso:
             
             print(f"Executando pipeline diário para {date_str}...")
             results = pipeline.run_daily_pipeline(date_str)
+            # Gravações em banco ainda pendentes são aguardadas antes de reportar o resultado
+            try:
+                pipeline.wait()
+            except Exception as e:
+                results.setdefault('error', f"Erro na gravação em banco de dados: {e}")
             
             print("\n" + "="*50)
             print("RESULTADOS DO PIPELINE DIÁRIO")
@@ -145,7 +157,14 @@ Exemplos de uso:
                 return 1
             
             print(f"Executando pipeline histórico de {args.start} a {args.end}...")
-            results = pipeline.run_historical_pipeline(args.start, args.end)
+            if args.batched:
+                results = pipeline.run_historical_batched(args.start, args.end)
+            else:
+                results = pipeline.run_historical_pipeline(args.start, args.end)
+            try:
+                pipeline.wait()
+            except Exception as e:
+                results.setdefault('fatal_error', f"Erro na gravação em banco de dados: {e}")
             
             print("\n" + "="*50)
             print("RESULTADOS DO PIPELINE HISTÓRICO")
@@ -163,6 +182,8 @@ Exemplos de uso:
                 print(f"Datas processadas: {dates_processed}")
                 print(f"Erros: {errors}")
                 print(f"Tempo total: {results.get('total_execution_time', 0):.2f}s")
+                if 'silver_dataset' in results:
+                    print(f"Dataset silver: {results['silver_dataset']}")
                 
                 if args.verbose and errors > 0:
                     print(f"\nDetalhes dos erros:")
@@ -181,6 +202,12 @@ Exemplos de uso:
             import traceback
             traceback.print_exc()
         return 1
+    finally:
+        if pipeline is not None:
+            try:
+                pipeline.close()
+            except Exception as e:
+                print(f"\nErro ao encerrar o pipeline: {e}")
 
 
 if __name__ == "__main__":
@@ -1,22 +1,34 @@
 """
 Módulos principais do pipeline de cotações cambiais.
+
+Os submódulos são importados sob demanda (PEP 562): importar apenas
+``src.config`` não carrega pandas, openai, sqlalchemy etc.
 """
 
-from .config import Config
-from .logger import setup_logging, PipelineLogger
-from .ingest import ExchangeRateIngester
-from .transform import ExchangeRateTransformer
-from .load import ExchangeRateLoader
-from .llm_analyzer import LLMAnalyzer
-from .pipeline import CurrencyExchangePipeline
-
-__all__ = [
-    "Config",
-    "setup_logging",
-    "PipelineLogger",
-    "ExchangeRateIngester",
-    "ExchangeRateTransformer", 
-    "ExchangeRateLoader",
-    "LLMAnalyzer",
-    "CurrencyExchangePipeline"
-]
+from importlib import import_module
+
+_EXPORTS = {
+    "Config": ".config",
+    "setup_logging": ".logger",
+    "PipelineLogger": ".logger",
+    "ExchangeRateIngester": ".ingest",
+    "ExchangeRateTransformer": ".transform",
+    "ExchangeRateLoader": ".load",
+    "LLMAnalyzer": ".llm_analyzer",
+    "CurrencyExchangePipeline": ".pipeline",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """Importa o submódulo correspondente no primeiro acesso ao nome exportado."""
+    if name in _EXPORTS:
+        value = getattr(import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -6,8 +6,15 @@ import os
 import yaml
 from pathlib import Path
 from dotenv import load_dotenv
-from typing import Dict, List, Any
+from typing import ClassVar, Dict, List, Set, Any
 from copy import deepcopy
+from functools import cached_property
+
+# Parser em C (libyaml) quando disponível; cai para o parser puro Python
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 # Carrega variáveis de ambiente
 load_dotenv()
@@ -15,6 +22,9 @@ load_dotenv()
 class Config:
     """Classe para gerenciar configurações do projeto."""
     
+    # Diretórios já garantidos neste processo (evita mkdir repetido a cada Config())
+    _ensured_dirs: ClassVar[Set[str]] = set()
+    
     def __init__(self, config_path: str = None):
         """
         Inicializa a configuração.
@@ -35,7 +45,7 @@ class Config:
         """Carrega configurações do arquivo YAML."""
         try:
             with open(self.config_path, 'r', encoding='utf-8') as file:
-                self._config = yaml.safe_load(file)
+                self._config = yaml.load(file, Loader=SafeLoader)
         except FileNotFoundError:
             raise FileNotFoundError(f"Arquivo de configuração não encontrado: {self.config_path}")
         except yaml.YAMLError as e:
@@ -60,7 +70,11 @@ class Config:
         """Cria diretórios de dados se não existirem."""
         try:
             for path in self._config.get('data_paths', {}).values():
+                key = os.path.abspath(path)
+                if key in Config._ensured_dirs:
+                    continue
                 Path(path).mkdir(parents=True, exist_ok=True)
+                Config._ensured_dirs.add(key)
         except Exception as e:
             raise RuntimeError(f"Falha ao criar diretórios de dados: {e}")
     
@@ -86,6 +100,16 @@ class Config:
         """Timeout para requisições da API."""
         return self._config['api']['timeout']
     
+    @property
+    def api_max_workers(self) -> int:
+        """Número máximo de requisições simultâneas à API."""
+        return self._config['api'].get('max_workers', 4)
+    
+    @property
+    def api_rate_limit_rps(self) -> float:
+        """Máximo de requisições por segundo à API (0 desabilita o limite)."""
+        return self._config['api'].get('rate_limit_rps', 10)
+    
     @property
     def base_currency(self) -> str:
         """Moeda base para cotações."""
@@ -143,7 +167,12 @@ class Config:
         Returns:
             str: URL completa
         """
-        return f"{self.api_base_url}/{self.exchange_rate_api_key}/{endpoint}"
+        return f"{self._api_prefix}/{endpoint}"
+    
+    @cached_property
+    def _api_prefix(self) -> str:
+        """Prefixo fixo das URLs da API (base_url + chave), montado uma única vez."""
+        return f"{self.api_base_url}/{self.exchange_rate_api_key}"
 
     # ---------------------- Métodos e propriedades adicionais para compatibilidade de testes ----------------------
     @property
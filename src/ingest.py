@@ -3,16 +3,55 @@ Módulo de ingestão de dados da API de cotações cambiais.
 """
 
 import json
+import numpy as np
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional
+import threading
 import time
 
 from .config import Config
 from .logger import PipelineLogger
 
 
+class RateLimiter:
+    """Token bucket thread-safe: até `rate` requisições por segundo, com rajada de `rate` (mínimo 1)."""
+    
+    def __init__(self, rate: float):
+        """
+        Inicializa o limitador.
+        
+        Args:
+            rate: Requisições por segundo (0 ou None desabilita o limite)
+        """
+        self.rate = rate
+        # Capacidade mínima de 1 token: com rate < 1 o balde nunca chegaria a 1 e acquire travaria
+        self._capacity = max(float(rate or 0), 1.0)
+        self._tokens = self._capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Consome um token, aguardando apenas o necessário quando a cota do segundo acabou."""
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
 class ExchangeRateIngester:
     """Classe responsável pela ingestão de dados de cotações cambiais."""
     
@@ -27,14 +66,24 @@ class ExchangeRateIngester:
         self.config = config
         self.logger = logger or PipelineLogger("ingest")
         self.session = requests.Session()
-        self.session.timeout = config.api_timeout
+        # Reaproveita conexões (keep-alive) e faz retry com backoff em rate-limit/erros 5xx.
+        # O timeout não é atributo de Session: é passado em cada requisição.
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        pool_size = config.api_max_workers
+        self.session.mount('https://', HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry))
+        # Limite de requisições por segundo compartilhado pelas threads da ingestão histórica
+        self.rate_limiter = RateLimiter(config.api_rate_limit_rps)
     
-    def fetch_exchange_rates(self, base_currency: str = None) -> Dict[str, Any]:
+    def fetch_exchange_rates(self, base_currency: str = None, date_str: str = None) -> Dict[str, Any]:
         """
         Busca cotações da API.
         
+        Sem data (ou com a data de hoje) usa o endpoint latest; para datas passadas
+        usa o endpoint history, que devolve as cotações daquele dia.
+        
         Args:
             base_currency: Moeda base (padrão: USD)
+            date_str: Data de referência (formato YYYY-MM-DD; padrão: cotação atual)
             
         Returns:
             Dict contendo os dados da API
@@ -45,16 +94,21 @@ class ExchangeRateIngester:
         """
         base_currency = base_currency or self.config.base_currency
         
-        # Constrói URL da API
-        endpoint = f"latest/{base_currency}"
+        # Constrói URL da API (a data entra na URL: cada dia é uma requisição distinta)
+        if date_str is None or date_str == datetime.now().strftime("%Y-%m-%d"):
+            endpoint = f"latest/{base_currency}"
+        else:
+            day = datetime.strptime(date_str, "%Y-%m-%d")
+            endpoint = f"history/{base_currency}/{day.year}/{day.month}/{day.day}"
         url = self.config.get_full_api_url(endpoint)
         
-        self.logger.info("Iniciando busca de cotações", base_currency=base_currency)
-        
-        start_time = time.time()
+        self.logger.info("Iniciando busca de cotações", base_currency=base_currency, date=date_str)
         
         try:
-            response = self.session.get(url)
+            # A espera do limitador não entra no tempo de resposta registrado
+            self.rate_limiter.acquire()
+            start_time = time.time()
+            response = self.session.get(url, timeout=self.config.api_timeout)
             response_time = time.time() - start_time
             
             # Log da requisição
@@ -110,10 +164,14 @@ class ExchangeRateIngester:
         if not isinstance(conversion_rates, dict) or len(conversion_rates) == 0:
             raise ValueError("Nenhuma cotação encontrada na resposta da API")
         
-        # Valida se as cotações são numéricas e positivas
-        for currency, rate in conversion_rates.items():
-            if not isinstance(rate, (int, float)) or rate <= 0:
-                raise ValueError(f"Taxa inválida para {currency}: {rate}")
+        # Valida se as cotações são numéricas, finitas e positivas em uma única passada vetorizada
+        rates = np.asarray(list(conversion_rates.values()))
+        if rates.dtype.kind not in 'iuf' or not (np.isfinite(rates) & (rates > 0)).all():
+            # Localiza a primeira taxa inválida apenas para compor a mensagem de erro
+            for currency, rate in conversion_rates.items():
+                if not isinstance(rate, (int, float)) or not np.isfinite(rate) or rate <= 0:
+                    raise ValueError(f"Taxa inválida para {currency}: {rate}")
+            raise ValueError("Taxas inválidas na resposta da API")
     
     def save_raw_data(self, data: Dict[str, Any], date_str: str = None) -> Path:
         """
@@ -126,8 +184,10 @@ class ExchangeRateIngester:
         Returns:
             Path do arquivo salvo
         """
+        # Instante único para a data padrão e o timestamp de ingestão
+        now = datetime.now()
         if date_str is None:
-            date_str = datetime.now().strftime("%Y-%m-%d")
+            date_str = now.strftime("%Y-%m-%d")
         
         # Cria diretório raw se não existir
         raw_dir = Path(self.config.data_paths['raw'])
@@ -141,7 +201,8 @@ class ExchangeRateIngester:
             # Adiciona metadados
             enriched_data = {
                 "metadata": {
-                    "ingestion_timestamp": datetime.now().isoformat(),
+                    "ingestion_timestamp": now.isoformat(),
+                    "reference_date": date_str,
                     "source": "exchangerate-api.com",
                     "base_currency": data.get('base_code'),
                     "currencies_count": len(data.get('conversion_rates', {}))
@@ -149,8 +210,9 @@ class ExchangeRateIngester:
                 "raw_data": data
             }
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(enriched_data, f, indent=2, ensure_ascii=False)
+            # orjson serializa direto para bytes UTF-8 (equivale a ensure_ascii=False)
+            with open(file_path, 'wb') as f:
+                f.write(orjson.dumps(enriched_data, option=orjson.OPT_INDENT_2))
             
             self.logger.log_data_processing(
                 operation="save_raw_data",
@@ -179,8 +241,8 @@ class ExchangeRateIngester:
         try:
             self.logger.log_pipeline_stage("ingest", "started")
             
-            # Busca dados da API
-            data = self.fetch_exchange_rates()
+            # Busca dados da API (cotações da própria data)
+            data = self.fetch_exchange_rates(date_str=date_str)
             
             # Salva dados brutos
             file_path = self.save_raw_data(data, date_str)
@@ -204,3 +266,42 @@ class ExchangeRateIngester:
                 error=str(e)
             )
             raise
+    
+    def ingest_historical_rates(self, dates: List[str],
+                                on_ingested: Optional[Callable[[str, Path], None]] = None) -> Dict[str, Any]:
+        """
+        Executa a ingestão de várias datas em paralelo.
+        
+        As requisições são limitadas por rede, então são disparadas em threads
+        que compartilham a mesma sessão (pool de conexões keep-alive).
+        
+        Args:
+            dates: Lista de datas (formato YYYY-MM-DD)
+            on_ingested: Chamado com (data, arquivo) assim que cada data termina,
+                permitindo que as etapas seguintes comecem antes do fim da ingestão
+            
+        Returns:
+            Dict com 'files' (data -> Path do arquivo bruto) e 'errors' (lista de falhas por data)
+        """
+        results = {'files': {}, 'errors': []}
+        
+        with ThreadPoolExecutor(max_workers=self.config.api_max_workers) as executor:
+            futures = {executor.submit(self.ingest_daily_rates, date_str): date_str for date_str in dates}
+            for future in as_completed(futures):
+                date_str = futures[future]
+                try:
+                    file_path = future.result()
+                except Exception as e:
+                    results['errors'].append({'date': date_str, 'error': str(e)})
+                    continue
+                results['files'][date_str] = file_path
+                if on_ingested is not None:
+                    on_ingested(date_str, file_path)
+        
+        self.logger.info(
+            "Ingestão histórica concluída",
+            dates_ingested=len(results['files']),
+            errors=len(results['errors'])
+        )
+        
+        return results
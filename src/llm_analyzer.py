@@ -2,17 +2,100 @@
 Módulo de análise e geração de insights usando LLM (ChatGPT).
 """
 
+import numpy as np
 import pandas as pd
+import hashlib
 import json
+import orjson
+import ssl
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 import time
-from openai import OpenAI
 
 from .config import Config
 from .logger import PipelineLogger
 
+if TYPE_CHECKING:
+    from openai import DefaultHttpxClient
+
+
+# Moedas detalhadas individualmente no resumo enviado ao LLM (as demais viram uma linha agregada)
+SUMMARY_TOP_N = 15
+
+# Colunas da camada gold usadas pela análise LLM
+SUMMARY_COLUMNS = [
+    'base_currency', 'target_currency', 'currency_category', 'latest_rate',
+    'min_rate', 'max_rate', 'avg_rate', 'volatility'
+]
+
+
+# Cliente HTTP compartilhado por todas as instâncias de LLMAnalyzer no processo:
+# o contexto SSL é montado uma vez e as conexões TLS (keep-alive) são reaproveitadas.
+# Contagem de referências: o cliente só é fechado quando o último analisador aberto é fechado
+_shared_http_client = None
+_shared_http_client_refs = 0
+_shared_http_client_lock = threading.Lock()
+
+
+def _acquire_shared_http_client() -> "DefaultHttpxClient":
+    """Retorna (criando se necessário) o cliente HTTP compartilhado e registra mais um usuário."""
+    from openai import DefaultHttpxClient
+    
+    global _shared_http_client, _shared_http_client_refs
+    with _shared_http_client_lock:
+        if _shared_http_client is None or _shared_http_client.is_closed:
+            _shared_http_client = DefaultHttpxClient(verify=ssl.create_default_context())
+        _shared_http_client_refs += 1
+        return _shared_http_client
+
+
+def _release_shared_http_client() -> None:
+    """Libera uma referência ao cliente compartilhado; fecha-o quando não resta nenhum usuário."""
+    global _shared_http_client, _shared_http_client_refs
+    with _shared_http_client_lock:
+        _shared_http_client_refs = max(_shared_http_client_refs - 1, 0)
+        if _shared_http_client_refs == 0 and _shared_http_client is not None:
+            _shared_http_client.close()
+            _shared_http_client = None
+
+
+class _LLMCache:
+    """Cache em disco de respostas do LLM, indexado pelo hash SHA-256 do prompt."""
+    
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    @staticmethod
+    def make_key(model: str, temperature: float, system_prompt: str, user_prompt: str) -> str:
+        """Gera a chave determinística da chamada (modelo, temperatura e mensagens)."""
+        # orjson já produz bytes compactos e com chaves ordenadas (sem encode extra)
+        payload = orjson.dumps(
+            {'model': model, 'temp': temperature, 'sys': system_prompt, 'user': user_prompt},
+            option=orjson.OPT_SORT_KEYS
+        )
+        return hashlib.sha256(payload).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Retorna o conteúdo em cache ou None."""
+        path = self.cache_dir / f"{key}.json"
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)['content']
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+    
+    def set(self, key: str, content: str) -> None:
+        """Grava o conteúdo (arquivo temporário + rename para não deixar entradas parciais)."""
+        path = self.cache_dir / f"{key}.json"
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'content': content}, f, ensure_ascii=False)
+        tmp_path.replace(path)
+
 
 class LLMAnalyzer:
     """Classe responsável pela análise de dados usando LLM."""
@@ -28,8 +111,30 @@ class LLMAnalyzer:
         self.config = config
         self.logger = logger or PipelineLogger("llm")
         
-        # Inicializa cliente OpenAI
-        self.client = OpenAI(api_key=config.openai_api_key)
+        # Import tardio: openai (httpx, pydantic...) só é carregado quando o analisador é usado
+        from openai import OpenAI
+        
+        # Inicializa cliente OpenAI sobre o cliente HTTP compartilhado
+        http_client = _acquire_shared_http_client()
+        try:
+            self.client = OpenAI(api_key=config.openai_api_key, http_client=http_client)
+        except Exception:
+            _release_shared_http_client()
+            raise
+        self._closed = False
+        
+        # Cache de respostas em disco (por padrão só com temperature 0, quando a saída é determinística)
+        llm_config = config.llm_config
+        if llm_config.get('cache', llm_config.get('temperature') == 0):
+            self.cache = _LLMCache(Path(config.data_paths['gold']) / ".llm_cache")
+        else:
+            self.cache = None
+    
+    def close(self):
+        """Libera este analisador; o cliente HTTP compartilhado fecha junto com o último aberto."""
+        if not self._closed:
+            self._closed = True
+            _release_shared_http_client()
     
     def load_gold_data(self, file_path: Path) -> pd.DataFrame:
         """
@@ -42,7 +147,8 @@ class LLMAnalyzer:
             DataFrame com dados gold
         """
         try:
-            df = pd.read_parquet(file_path, engine='pyarrow')
+            # Lê apenas as colunas usadas no resumo e nos prompts
+            df = pd.read_parquet(file_path, engine='pyarrow', columns=SUMMARY_COLUMNS)
             
             self.logger.info("Dados gold carregados para análise LLM", 
                            file_path=str(file_path), 
@@ -53,60 +159,132 @@ class LLMAnalyzer:
             self.logger.error("Erro ao carregar dados gold", error=e, file_path=str(file_path))
             raise
     
-    def prepare_data_summary(self, df: pd.DataFrame) -> str:
+    def prepare_data_summary(self, df: pd.DataFrame, top_n: int = SUMMARY_TOP_N) -> str:
         """
         Prepara resumo dos dados para o LLM.
         
+        Só as top_n moedas mais voláteis são detalhadas; as demais são resumidas
+        em uma linha agregada para reduzir o tamanho do prompt.
+        
         Args:
             df: DataFrame com dados gold
+            top_n: Número de moedas detalhadas individualmente
             
         Returns:
             String com resumo formatado dos dados
         """
         try:
-            # Ordena por volatilidade para destacar moedas mais voláteis
-            df_sorted = df.sort_values('volatility', ascending=False)
-            
-            # Cria resumo estruturado
-            summary_data = []
-            
-            for _, row in df_sorted.iterrows():
-                currency_info = {
-                    "moeda": row['target_currency'],
-                    "categoria": row['currency_category'],
-                    "taxa_atual": round(row['latest_rate'], 4),
-                    "taxa_minima": round(row['min_rate'], 4),
-                    "taxa_maxima": round(row['max_rate'], 4),
-                    "taxa_media": round(row['avg_rate'], 4),
-                    "volatilidade": round(row['volatility'] * 100, 2)  # Converte para percentual
-                }
-                summary_data.append(currency_info)
-            
-            # Formata como string legível
-            summary_text = f"""
+            # Ordena por volatilidade (decrescente) só os índices, sem copiar o DataFrame inteiro
+            all_order = np.argsort(-df['volatility'].to_numpy(dtype=float), kind='stable')
+            order, rest = all_order[:top_n], all_order[top_n:]
+            
+            # Colunas como arrays numpy: evita iterrows (um Series por linha) e dicts intermediários
+            moedas = df['target_currency'].to_numpy()[order]
+            categorias = df['currency_category'].to_numpy()[order]
+            # Arredondamento vetorizado (um ufunc por coluna em vez de round() por célula)
+            taxas_atuais = np.round(df['latest_rate'].to_numpy()[order], 4)
+            taxas_minimas = np.round(df['min_rate'].to_numpy()[order], 4)
+            taxas_maximas = np.round(df['max_rate'].to_numpy()[order], 4)
+            taxas_medias = np.round(df['avg_rate'].to_numpy()[order], 4)
+            volatilidades_pct = np.round(df['volatility'].to_numpy()[order] * 100, 2)
+            
+            # Formata como string legível (partes em lista + um único join)
+            parts = [f"""
 RELATÓRIO DE COTAÇÕES CAMBIAIS - {datetime.now().strftime('%d/%m/%Y')}
 
 Moeda Base: {df.iloc[0]['base_currency']}
 Total de Moedas Analisadas: {len(df)}
 
 DETALHAMENTO POR MOEDA:
+"""]
+            
+            parts.extend(
+                f"""
+{moeda} ({categoria.upper()}):
+- Taxa Atual: {atual}
+- Variação: {minima} - {maxima}
+- Taxa Média: {media}
+- Volatilidade: {volatilidade}%
 """
+                for moeda, categoria, atual, minima, maxima, media, volatilidade in zip(
+                    moedas, categorias, taxas_atuais, taxas_minimas, taxas_maximas, taxas_medias, volatilidades_pct
+                )
+            )
             
-            for currency in summary_data:
-                summary_text += f"""
-{currency['moeda']} ({currency['categoria'].upper()}):
-- Taxa Atual: {currency['taxa_atual']}
-- Variação: {currency['taxa_minima']} - {currency['taxa_maxima']}
-- Taxa Média: {currency['taxa_media']}
-- Volatilidade: {currency['volatilidade']}%
-"""
-            
-            return summary_text.strip()
+            if len(rest):
+                # Cauda agregada: faixa de volatilidade e as moedas mais estáveis
+                # (NaN fica no fim da ordenação e é ignorado aqui)
+                rest_vol = df['volatility'].to_numpy(dtype=float)[rest] * 100
+                finite = np.isfinite(rest_vol)
+                parts.append(f"\nDEMAIS MOEDAS ({len(rest)} com menor volatilidade):\n")
+                if finite.any():
+                    rest_vol = rest_vol[finite]
+                    stable = ", ".join(
+                        f"{moeda} ({round(vol, 2)}%)"
+                        for moeda, vol in zip(df['target_currency'].to_numpy()[rest[finite]][::-1][:5], rest_vol[::-1][:5])
+                    )
+                    parts.append(
+                        f"- Volatilidade: {round(rest_vol.min(), 2)}% - {round(rest_vol.max(), 2)}% "
+                        f"(média {round(rest_vol.mean(), 2)}%)\n"
+                        f"- Mais estáveis: {stable}\n"
+                    )
+            
+            return "".join(parts).strip()
             
         except Exception as e:
             self.logger.error("Erro ao preparar resumo dos dados", error=e)
             raise
     
+    def _cached_complete(self, system_prompt: str, user_prompt: str) -> str:
+        """
+        Executa uma chamada ao LLM, reaproveitando a resposta em cache para prompts idênticos.
+        
+        O cache só é usado quando habilitado em llm.cache (padrão: apenas com
+        temperature 0, quando a resposta é determinística).
+        
+        Args:
+            system_prompt: Mensagem de sistema
+            user_prompt: Mensagem do usuário
+            
+        Returns:
+            Conteúdo da resposta do LLM
+        """
+        llm_config = self.config.llm_config
+        model = llm_config['model']
+        temperature = llm_config['temperature']
+        
+        cache_key = None
+        if self.cache is not None:
+            cache_key = _LLMCache.make_key(model, temperature, system_prompt, user_prompt)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.logger.info("Resposta do LLM obtida do cache", model=model, cache_key=cache_key)
+                return cached
+        
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            max_tokens=llm_config['max_tokens'],
+            temperature=temperature
+        )
+        content = response.choices[0].message.content
+        
+        # Log da interação com LLM
+        self.logger.log_llm_interaction(
+            prompt_length=len(user_prompt),
+            response_length=len(content),
+            model=model,
+            tokens_used=response.usage.total_tokens if response.usage else None
+        )
+        
+        if cache_key is not None:
+            self.cache.set(cache_key, content)
+        
+        return content
+    
     def generate_business_insights(self, data_summary: str) -> str:
         """
         Gera insights de negócio usando LLM.
@@ -146,26 +324,12 @@ Use linguagem clara e evite jargões técnicos. Foque em insights acionáveis pa
 
             start_time = time.time()
             
-            response = self.client.chat.completions.create(
-                model=self.config.llm_config['model'],
-                messages=[
-                    {"role": "system", "content": "Você é um analista financeiro especializado em câmbio que fornece insights claros para executivos de negócio."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=self.config.llm_config['max_tokens'],
-                temperature=self.config.llm_config['temperature']
+            insights = self._cached_complete(
+                "Você é um analista financeiro especializado em câmbio que fornece insights claros para executivos de negócio.",
+                prompt
             )
             
             response_time = time.time() - start_time
-            insights = response.choices[0].message.content
-            
-            # Log da interação com LLM
-            self.logger.log_llm_interaction(
-                prompt_length=len(prompt),
-                response_length=len(insights),
-                model=self.config.llm_config['model'],
-                tokens_used=response.usage.total_tokens if response.usage else None
-            )
             
             self.logger.info("Insights de negócio gerados com sucesso", 
                            response_time_seconds=response_time)
@@ -189,13 +353,11 @@ Use linguagem clara e evite jargões técnicos. Foque em insights acionáveis pa
         """
         try:
             if focus_currencies is None:
-                # Seleciona top 5 moedas por volatilidade
-                top_currencies = df.nlargest(5, 'volatility')['target_currency'].tolist()
+                # Top 5 moedas por volatilidade (já é o recorte final, sem nova filtragem)
+                focus_data = df.nlargest(5, 'volatility')
             else:
-                top_currencies = focus_currencies
-            
-            # Filtra dados das moedas selecionadas
-            focus_data = df[df['target_currency'].isin(top_currencies)]
+                # Filtra dados das moedas selecionadas
+                focus_data = df[df['target_currency'].isin(focus_currencies)]
             
             # Prepara dados das moedas selecionadas
             currency_details = []
@@ -217,31 +379,11 @@ Para cada moeda, explique:
 Use linguagem acessível, como se estivesse explicando para alguém que não é especialista em câmbio.
 """
 
-            start_time = time.time()
-            
-            response = self.client.chat.completions.create(
-                model=self.config.llm_config['model'],
-                messages=[
-                    {"role": "system", "content": "Você é um consultor financeiro que explica câmbio de forma simples e prática."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=self.config.llm_config['max_tokens'],
-                temperature=self.config.llm_config['temperature']
-            )
-            
-            response_time = time.time() - start_time
-            explanation = response.choices[0].message.content
-            
-            # Log da interação
-            self.logger.log_llm_interaction(
-                prompt_length=len(prompt),
-                response_length=len(explanation),
-                model=self.config.llm_config['model'],
-                tokens_used=response.usage.total_tokens if response.usage else None
+            return self._cached_complete(
+                "Você é um consultor financeiro que explica câmbio de forma simples e prática.",
+                prompt
             )
             
-            return explanation
-            
         except Exception as e:
             self.logger.error("Erro ao gerar explicação de moedas", error=e)
             raise
@@ -258,8 +400,10 @@ Use linguagem acessível, como se estivesse explicando para alguém que não é
         Returns:
             Path do arquivo salvo
         """
+        # Instante único: datas e timestamps do relatório ficam consistentes entre si
+        now = datetime.now()
         if date_str is None:
-            date_str = datetime.now().strftime("%Y-%m-%d")
+            date_str = now.strftime("%Y-%m-%d")
         
         # Cria diretório gold se não existir
         gold_dir = Path(self.config.data_paths['gold'])
@@ -268,13 +412,13 @@ Use linguagem acessível, como se estivesse explicando para alguém que não é
         # Estrutura o relatório final
         report = {
             "metadata": {
-                "generation_date": datetime.now().isoformat(),
+                "generation_date": now.isoformat(),
                 "model_used": self.config.llm_config['model'],
                 "report_type": "currency_analysis"
             },
             "business_insights": insights,
             "currency_explanation": explanation,
-            "generation_timestamp": datetime.now().isoformat()
+            "generation_timestamp": now.isoformat()
         }
         
         # Salva em JSON
@@ -286,13 +430,14 @@ Use linguagem acessível, como se estivesse explicando para alguém que não é
         txt_path = gold_dir / txt_filename
         
         try:
-            # Salva JSON estruturado
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(report, f, indent=2, ensure_ascii=False)
+            # Salva JSON estruturado (lido pelo dashboard): o texto em português do LLM
+            # fica com os acentos legíveis no arquivo, sem escapes \uXXXX
+            with open(json_path, 'wb') as f:
+                f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
             
             # Salva relatório em texto legível
             report_text = f"""
-RELATÓRIO DE ANÁLISE CAMBIAL - {datetime.now().strftime('%d/%m/%Y %H:%M')}
+RELATÓRIO DE ANÁLISE CAMBIAL - {now.strftime('%d/%m/%Y %H:%M')}
 {'='*60}
 
 INSIGHTS DE NEGÓCIO:
@@ -345,11 +490,13 @@ Modelo LLM utilizado: {self.config.llm_config['model']}
             # Prepara resumo dos dados
             data_summary = self.prepare_data_summary(df)
             
-            # Gera insights de negócio
-            business_insights = self.generate_business_insights(data_summary)
-            
-            # Gera explicação das moedas
-            currency_explanation = self.generate_currency_explanation(df)
+            # Gera insights de negócio e explicação das moedas em paralelo:
+            # os dois prompts são independentes e cada chamada é limitada por rede
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                insights_future = executor.submit(self.generate_business_insights, data_summary)
+                explanation_future = executor.submit(self.generate_currency_explanation, df)
+                business_insights = insights_future.result()
+                currency_explanation = explanation_future.result()
             
             # Salva relatório final
             report_path = self.save_llm_insights(business_insights, currency_explanation, date_str)
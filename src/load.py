@@ -2,21 +2,46 @@
 Módulo de carga de dados para a camada gold (dados finais).
 """
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import ClassVar, Dict, Any, List, Optional, Union
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
 import sqlalchemy as sa
 
 from .config import Config
 from .logger import PipelineLogger
 
+try:
+    # Driver ADBC opcional: ingere a tabela Arrow direto via COPY no Postgres
+    import adbc_driver_postgresql.dbapi as adbc_postgresql
+except ImportError:
+    adbc_postgresql = None
+
+
+# Colunas da camada silver usadas nas agregações
+SILVER_COLUMNS = ['timestamp', 'base_currency', 'target_currency', 'exchange_rate', 'currency_category']
+
+# Ordem das colunas da camada gold
+GOLD_COLUMNS = [
+    'date', 'base_currency', 'target_currency', 'latest_rate', 'min_rate', 'max_rate',
+    'avg_rate', 'std_rate', 'volatility', 'currency_category', 'processing_timestamp', 'records_count'
+]
+
 
 class ExchangeRateLoader:
     """Classe responsável pela carga de dados na camada gold."""
     
+    # Engines por string de conexão: loaders do mesmo processo compartilham o pool de conexões
+    _ENGINE_CACHE: ClassVar[Dict[str, Engine]] = {}
+    
     def __init__(self, config: Config, logger: PipelineLogger = None):
         """
         Inicializa o loader.
@@ -28,6 +53,12 @@ class ExchangeRateLoader:
         self.config = config
         self.logger = logger or PipelineLogger("load")
         self.db_engine = None
+        self._db_uri = None
+        # Gravação em banco em segundo plano: o pipeline segue após o parquet e aguarda em wait().
+        # As gravações pendentes ficam por data, para que a falha seja atribuída ao dia certo
+        self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._db_futures: Dict[str, List[Future]] = {}
+        self._db_futures_lock = threading.Lock()
         
         if config.database_enabled:
             self._setup_database_connection()
@@ -39,7 +70,20 @@ class ExchangeRateLoader:
                 f"postgresql://{self.config.db_user}:{self.config.db_password}@"
                 f"{self.config.db_host}:{self.config.db_port}/{self.config.db_name}"
             )
-            self.db_engine = create_engine(connection_string)
+            engine = ExchangeRateLoader._ENGINE_CACHE.get(connection_string)
+            if engine is None:
+                # Driver psycopg (3): permite COPY FROM STDIN na gravação.
+                # pre_ping/recycle descartam conexões derrubadas pelo servidor antes do uso
+                engine = create_engine(
+                    connection_string.replace("postgresql://", "postgresql+psycopg://", 1),
+                    pool_size=10,
+                    max_overflow=20,
+                    pool_pre_ping=True,
+                    pool_recycle=1800
+                )
+                ExchangeRateLoader._ENGINE_CACHE[connection_string] = engine
+            self.db_engine = engine
+            self._db_uri = connection_string
             self.logger.info("Conexão com banco de dados configurada")
         except Exception as e:
             self.logger.error("Erro ao configurar conexão com banco", error=e)
@@ -56,7 +100,8 @@ class ExchangeRateLoader:
             DataFrame com dados silver
         """
         try:
-            df = pd.read_parquet(file_path, engine='pyarrow')
+            # Lê apenas as colunas usadas nas agregações
+            df = pd.read_parquet(file_path, engine='pyarrow', columns=SILVER_COLUMNS)
             
             self.logger.info("Dados silver carregados", 
                            file_path=str(file_path), 
@@ -80,45 +125,36 @@ class ExchangeRateLoader:
         try:
             # Converte timestamp para datetime se necessário
             if 'timestamp' in df.columns:
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-            # Agrupa por moeda e calcula estatísticas
-            gold_data = []
-            
-            for currency in df['target_currency'].unique():
-                currency_data = df[df['target_currency'] == currency].copy()
-                
-                if len(currency_data) == 0:
-                    continue
-                
-                # Calcula métricas básicas
-                latest_rate = currency_data['exchange_rate'].iloc[-1]
-                min_rate = currency_data['exchange_rate'].min()
-                max_rate = currency_data['exchange_rate'].max()
-                avg_rate = currency_data['exchange_rate'].mean()
-                std_rate = currency_data['exchange_rate'].std()
-                
-                # Calcula volatilidade (coeficiente de variação)
-                volatility = std_rate / avg_rate if avg_rate != 0 else 0
-                
-                record = {
-                    'date': datetime.now().strftime('%Y-%m-%d'),
-                    'base_currency': currency_data['base_currency'].iloc[0],
-                    'target_currency': currency,
-                    'latest_rate': latest_rate,
-                    'min_rate': min_rate,
-                    'max_rate': max_rate,
-                    'avg_rate': avg_rate,
-                    'std_rate': std_rate,
-                    'volatility': volatility,
-                    'currency_category': currency_data['currency_category'].iloc[0],
-                    'processing_timestamp': datetime.now().isoformat(),
-                    'records_count': len(currency_data)
-                }
-                
-                gold_data.append(record)
-            
-            gold_df = pd.DataFrame(gold_data)
+                if not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
+                    # ISO-8601 vindo do transform: parser rápido em C e cache dos valores repetidos
+                    df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601', cache=True, utc=True)
+                # Ordem cronológica (estável) para que first/last sejam a observação mais antiga/recente
+                if not df['timestamp'].is_monotonic_increasing:
+                    df = df.sort_values('timestamp', kind='mergesort')
+            
+            # Agrupa por moeda e calcula todas as estatísticas em uma única passada vetorizada
+            gold_df = df.groupby('target_currency', sort=False).agg(
+                base_currency=('base_currency', 'first'),
+                latest_rate=('exchange_rate', 'last'),
+                min_rate=('exchange_rate', 'min'),
+                max_rate=('exchange_rate', 'max'),
+                avg_rate=('exchange_rate', 'mean'),
+                std_rate=('exchange_rate', 'std'),
+                currency_category=('currency_category', 'first'),
+                records_count=('exchange_rate', 'size'),
+            ).reset_index()
+            
+            # Calcula volatilidade (coeficiente de variação)
+            avg_rate = gold_df['avg_rate'].to_numpy()
+            std_rate = gold_df['std_rate'].to_numpy()
+            # Divide só onde a média é não nula; o restante fica com o 0 pré-preenchido
+            gold_df['volatility'] = np.divide(std_rate, avg_rate, out=np.zeros(len(gold_df)), where=avg_rate != 0)
+            
+            # Colunas constantes: uma leitura do relógio, atribuída em broadcast
+            now = datetime.now()
+            gold_df['date'] = now.strftime('%Y-%m-%d')
+            gold_df['processing_timestamp'] = now.isoformat()
+            gold_df = gold_df[GOLD_COLUMNS]
             
             self.logger.log_data_processing(
                 operation="calculate_aggregations",
@@ -131,12 +167,12 @@ class ExchangeRateLoader:
             self.logger.error("Erro ao calcular agregações", error=e)
             raise
     
-    def save_gold_data(self, df: pd.DataFrame, date_str: str = None) -> Path:
+    def save_gold_data(self, data: Union[pd.DataFrame, pa.Table], date_str: str = None) -> Path:
         """
         Salva dados finais na camada gold.
         
         Args:
-            df: DataFrame a ser salvo
+            data: DataFrame ou tabela Arrow a ser salva
             date_str: String da data (formato YYYY-MM-DD)
             
         Returns:
@@ -154,12 +190,13 @@ class ExchangeRateLoader:
         file_path = gold_dir / filename
         
         try:
-            # Salva em formato Parquet
-            df.to_parquet(file_path, index=False, engine='pyarrow')
+            # Salva em formato Parquet (snappy + dicionário: leitura rápida de colunas repetitivas)
+            table = data if isinstance(data, pa.Table) else pa.Table.from_pandas(data, preserve_index=False)
+            pq.write_table(table, file_path, compression='snappy', use_dictionary=True)
             
             self.logger.log_data_processing(
                 operation="save_gold_data",
-                records_count=len(df),
+                records_count=len(table),
                 file_path=str(file_path)
             )
             
@@ -169,12 +206,15 @@ class ExchangeRateLoader:
             self.logger.error("Erro ao salvar dados gold", error=e, file_path=str(file_path))
             raise
     
-    def save_to_database(self, df: pd.DataFrame, table_name: str = "exchange_rates_gold"):
+    def save_to_database(self, data: Union[pd.DataFrame, pa.Table], table_name: str = "exchange_rates_gold"):
         """
         Salva dados no banco de dados (opcional).
         
+        Com o driver ADBC instalado a tabela Arrow é ingerida diretamente;
+        caso contrário as linhas são enviadas via COPY FROM STDIN (psycopg).
+        
         Args:
-            df: DataFrame a ser salvo
+            data: DataFrame ou tabela Arrow a ser salva
             table_name: Nome da tabela
         """
         if not self.db_engine:
@@ -182,18 +222,21 @@ class ExchangeRateLoader:
             return
         
         try:
-            # Salva dados na tabela
-            df.to_sql(
-                table_name,
-                self.db_engine,
-                if_exists='append',
-                index=False,
-                method='multi'
-            )
+            if adbc_postgresql is not None:
+                # Arrow -> COPY, sem serializar o DataFrame novamente.
+                # create_append cria a tabela na primeira carga, como to_sql e o caminho COPY
+                table = data if isinstance(data, pa.Table) else pa.Table.from_pandas(data, preserve_index=False)
+                with adbc_postgresql.connect(self._db_uri) as conn:
+                    with conn.cursor() as cursor:
+                        cursor.adbc_ingest(table_name, table, mode='create_append')
+                    conn.commit()
+            else:
+                df = data.to_pandas() if isinstance(data, pa.Table) else data
+                self._copy_to_database(df, table_name)
             
             self.logger.log_data_processing(
                 operation="save_to_database",
-                records_count=len(df),
+                records_count=len(data),
                 table_name=table_name
             )
             
@@ -201,6 +244,31 @@ class ExchangeRateLoader:
             self.logger.error("Erro ao salvar no banco de dados", error=e, table_name=table_name)
             raise
     
+    def _copy_to_database(self, df: pd.DataFrame, table_name: str) -> None:
+        """
+        Grava o DataFrame com COPY FROM STDIN, evitando o INSERT parametrizado linha a linha.
+        
+        Args:
+            df: DataFrame a ser salvo
+            table_name: Nome da tabela
+        """
+        # Cria a tabela a partir do schema do DataFrame se ainda não existir (COPY exige tabela pronta)
+        df.head(0).to_sql(table_name, self.db_engine, if_exists='append', index=False)
+        
+        columns = ", ".join(f'"{col}"' for col in df.columns)
+        # NaN vira NULL (o COPY em texto gravaria 'NaN')
+        rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        
+        raw_conn = self.db_engine.raw_connection()
+        try:
+            with raw_conn.cursor() as cursor:
+                with cursor.copy(f'COPY "{table_name}" ({columns}) FROM STDIN') as copy:
+                    for row in rows:
+                        copy.write_row(row)
+            raw_conn.commit()
+        finally:
+            raw_conn.close()
+    
     def load_daily_data(self, silver_file_path: Path, date_str: str = None) -> Path:
         """
         Executa o processo completo de carga diária.
@@ -223,12 +291,17 @@ class ExchangeRateLoader:
             # Calcula agregações
             gold_df = self.calculate_aggregations(df)
             
+            # Converte uma única vez para Arrow: a mesma tabela alimenta o parquet e o banco
+            gold_table = pa.Table.from_pandas(gold_df, preserve_index=False)
+            
             # Salva dados gold
-            file_path = self.save_gold_data(gold_df, date_str)
+            file_path = self.save_gold_data(gold_table, date_str)
             
-            # Salva no banco de dados se habilitado
+            # Salva no banco de dados se habilitado (em segundo plano; aguardado em wait(date_str))
             if self.config.database_enabled:
-                self.save_to_database(gold_df)
+                future = self._db_executor.submit(self.save_to_database, gold_table)
+                with self._db_futures_lock:
+                    self._db_futures.setdefault(date_str or datetime.now().strftime("%Y-%m-%d"), []).append(future)
             
             duration = time.time() - start_time
             self.logger.log_pipeline_stage(
@@ -250,3 +323,24 @@ class ExchangeRateLoader:
                 error=str(e)
             )
             raise
+    
+    def wait(self, date_str: str = None) -> None:
+        """
+        Aguarda as gravações em banco pendentes.
+        
+        Args:
+            date_str: Aguarda só as gravações dessa data (padrão: todas)
+        
+        Raises:
+            Exception: Primeiro erro ocorrido nas gravações em segundo plano
+        """
+        with self._db_futures_lock:
+            if date_str is None:
+                futures = [f for pending in self._db_futures.values() for f in pending]
+                self._db_futures = {}
+            else:
+                futures = self._db_futures.pop(date_str, [])
+        errors = [future.exception() for future in futures]
+        for error in errors:
+            if error is not None:
+                raise error
@@ -8,6 +8,10 @@ from pathlib import Path
 from typing import Any, Dict
 from datetime import datetime
 
+# Processadores sem estado: instanciados uma única vez e reaproveitados a cada configuração
+_JSON_RENDERER = structlog.processors.JSONRenderer()
+_TIMESTAMPER = structlog.processors.TimeStamper(fmt="ISO")
+
 def setup_logging(log_level: str = "INFO", log_dir: str = "logs") -> structlog.stdlib.BoundLogger:
     """
     Configura o sistema de logging estruturado.
@@ -19,6 +23,10 @@ def setup_logging(log_level: str = "INFO", log_dir: str = "logs") -> structlog.s
     Returns:
         Logger estruturado configurado
     """
+    # Já configurado neste processo: não reabre o arquivo de log nem refaz a cadeia de processadores
+    if logging.getLogger().handlers and structlog.is_configured():
+        return structlog.get_logger()
+    
     # Cria diretório de logs se não existir
     log_path = Path(log_dir)
     log_path.mkdir(exist_ok=True)
@@ -43,8 +51,8 @@ def setup_logging(log_level: str = "INFO", log_dir: str = "logs") -> structlog.s
             structlog.processors.add_log_level,
             structlog.processors.StackInfoRenderer(),
             structlog.dev.set_exc_info,
-            structlog.processors.TimeStamper(fmt="ISO"),
-            structlog.dev.ConsoleRenderer() if log_level == "DEBUG" else structlog.processors.JSONRenderer()
+            _TIMESTAMPER,
+            structlog.dev.ConsoleRenderer() if log_level == "DEBUG" else _JSON_RENDERER
         ],
         wrapper_class=structlog.stdlib.BoundLogger,
         logger_factory=structlog.stdlib.LoggerFactory(),
@@ -68,8 +76,23 @@ class PipelineLogger:
         self.logger = logger or structlog.get_logger()
         self.logger = self.logger.bind(component=component_name)
     
-    def info(self, message: str, **kwargs):
-        """Log de informação."""
+    @property
+    def _info_enabled(self) -> bool:
+        """
+        Se INFO está habilitado: os log_* não montam kwargs quando não está.
+        
+        Avaliado a cada chamada (isEnabledFor já é cacheado pelo logging), para refletir
+        setup_logging ou mudanças de nível feitas depois da criação do logger.
+        Sem structlog configurado (sem setup_logging) tudo é impresso, independente do logging padrão.
+        """
+        return not structlog.is_configured() or logging.getLogger().isEnabledFor(logging.INFO)
+    
+    def info(self, message: str, *args, **kwargs):
+        """Log de informação. Argumentos posicionais são formatados (%s) só se INFO estiver habilitado."""
+        if not self._info_enabled:
+            return
+        if args:
+            message = message % args
         self.logger.info(message, **kwargs)
     
     def error(self, message: str, error: Exception = None, **kwargs):
@@ -89,6 +112,8 @@ class PipelineLogger:
     
     def log_api_request(self, url: str, method: str = "GET", status_code: int = None, response_time: float = None):
         """Log específico para requisições de API."""
+        if not self._info_enabled:
+            return
         self.logger.info(
             "API request completed",
             url=url,
@@ -97,17 +122,22 @@ class PipelineLogger:
             response_time_ms=response_time * 1000 if response_time else None
         )
     
-    def log_data_processing(self, operation: str, records_count: int, file_path: str = None):
+    def log_data_processing(self, operation: str, records_count: int, file_path: str = None, **kwargs):
         """Log específico para processamento de dados."""
+        if not self._info_enabled:
+            return
         self.logger.info(
             "Data processing completed",
             operation=operation,
             records_count=records_count,
-            file_path=file_path
+            file_path=file_path,
+            **kwargs
         )
     
     def log_llm_interaction(self, prompt_length: int, response_length: int, model: str, tokens_used: int = None):
         """Log específico para interações com LLM."""
+        if not self._info_enabled:
+            return
         self.logger.info(
             "LLM interaction completed",
             model=model,
@@ -118,6 +148,8 @@ class PipelineLogger:
     
     def log_pipeline_stage(self, stage: str, status: str, duration: float = None, **kwargs):
         """Log específico para estágios do pipeline."""
+        if not self._info_enabled:
+            return
         self.logger.info(
             f"Pipeline stage {status}",
             stage=stage,
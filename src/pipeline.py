@@ -2,10 +2,12 @@
 Módulo principal do pipeline de cotações cambiais.
 """
 
-from datetime import datetime
+import os
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Any, Optional
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from .config import Config
 from .logger import setup_logging, PipelineLogger
@@ -15,6 +17,10 @@ from .load import ExchangeRateLoader
 from .llm_analyzer import LLMAnalyzer
 
 
+# Por quanto tempo (segundos) o resultado de validate_setup é reaproveitado
+VALIDATION_TTL_SECONDS = 60
+
+
 class CurrencyExchangePipeline:
     """Pipeline principal para processamento de cotações cambiais."""
     
@@ -40,6 +46,15 @@ class CurrencyExchangePipeline:
         self.transformer = ExchangeRateTransformer(self.config, PipelineLogger("transform", self.main_logger))
         self.loader = ExchangeRateLoader(self.config, PipelineLogger("load", self.main_logger))
         self.llm_analyzer = LLMAnalyzer(self.config, PipelineLogger("llm", self.main_logger))
+        
+        # Diretórios de dados resolvidos uma vez para as consultas de status
+        self._data_path_objs = {
+            key: Path(self.config.data_paths[key]) for key in ('bronze', 'silver', 'gold', 'logs')
+        }
+        
+        # Resultado memoizado de validate_setup (consultas de status repetidas não revalidam)
+        self._validated_at = 0.0
+        self._validated_ok = None
     
     def validate_setup(self) -> bool:
         """
@@ -48,6 +63,9 @@ class CurrencyExchangePipeline:
         Returns:
             bool: True se configuração é válida
         """
+        if self._validated_ok is not None and time.monotonic() - self._validated_at < VALIDATION_TTL_SECONDS:
+            return self._validated_ok
+        
         try:
             self.logger.info("Validando configuração do pipeline")
             
@@ -55,18 +73,27 @@ class CurrencyExchangePipeline:
             self.config.validate_api_keys()
             
             self.logger.info("Pipeline configurado corretamente")
-            return True
+            valid = True
             
         except Exception as e:
             self.logger.error("Erro na validação da configuração", error=e)
-            return False
+            valid = False
+        
+        self._validated_ok = valid
+        self._validated_at = time.monotonic()
+        return valid
     
-    def run_daily_pipeline(self, date_str: str = None) -> Dict[str, Any]:
+    def invalidate_validation(self):
+        """Descarta o resultado memoizado de validate_setup (força nova validação)."""
+        self._validated_ok = None
+    
+    def run_daily_pipeline(self, date_str: str = None, bronze_file: Path = None) -> Dict[str, Any]:
         """
         Executa o pipeline completo para um dia.
         
         Args:
             date_str: Data no formato YYYY-MM-DD (padrão: hoje)
+            bronze_file: Arquivo bruto já ingerido (pula a etapa de ingestão)
             
         Returns:
             Dict com resultados da execução
@@ -76,40 +103,53 @@ class CurrencyExchangePipeline:
         
         start_time = time.time()
         results = {}
+        files_created = 0
+        
+        def _record(key: str, path: Path) -> Path:
+            """Registra o arquivo gerado pela etapa (Path nativo) e conta os parquet."""
+            nonlocal files_created
+            results[key] = path
+            if os.fspath(path).endswith('.parquet'):
+                files_created += 1
+            return path
         
         try:
-            self.logger.info(f"Iniciando pipeline diário para {date_str}")
+            self.logger.info("Iniciando pipeline diário para %s", date_str)
             
             # 1. Ingestão
-            self.logger.info("Etapa 1: Ingestão de dados")
-            bronze_file = self.ingester.ingest_daily_rates(date_str)
+            if bronze_file is None:
+                self.logger.info("Etapa 1: Ingestão de dados")
+                bronze_file = self.ingester.ingest_daily_rates(date_str)
             # Compat: expor tanto bronze_file quanto raw_file (legado)
-            results['bronze_file'] = str(bronze_file)
-            results['raw_file'] = str(bronze_file)
+            results['raw_file'] = _record('bronze_file', bronze_file)
             
             # 2. Transformação
             self.logger.info("Etapa 2: Transformação de dados")
             silver_file = self.transformer.transform_daily_data(bronze_file, date_str)
-            results['silver_file'] = str(silver_file)
+            _record('silver_file', silver_file)
             
             # 3. Carga
             self.logger.info("Etapa 3: Carga para camada gold")
             gold_file = self.loader.load_daily_data(silver_file, date_str)
-            results['gold_file'] = str(gold_file)
+            _record('gold_file', gold_file)
             
             # 4. Análise LLM
             self.logger.info("Etapa 4: Análise com LLM")
             llm_results = self.llm_analyzer.analyze_daily_data(gold_file, date_str)
             results['llm_analysis'] = llm_results
             
+            # 5. Gravação em banco da data (em segundo plano, sobreposta à análise LLM)
+            self.loader.wait(date_str)
+            
             # Calcula tempo total
             execution_time = time.time() - start_time
             results['execution_time'] = execution_time
             
             self.logger.info(
-                f"Pipeline concluído com sucesso para {date_str}",
+                "Pipeline concluído com sucesso para %s",
+                date_str,
                 execution_time=execution_time,
-                files_created=len([f for f in results.values() if isinstance(f, str) and f.endswith('.parquet')])
+                files_created=files_created
             )
             
             return results
@@ -123,6 +163,11 @@ class CurrencyExchangePipeline:
             )
             results['error'] = str(e)
             results['execution_time'] = execution_time
+            # Não deixa a gravação em banco da data pendente sem dono
+            try:
+                self.loader.wait(date_str)
+            except Exception as db_error:
+                self.logger.error("Erro na gravação em banco de dados", error=db_error, date=date_str)
             return results
     
     def run_historical_pipeline(self, start_date: str, end_date: str) -> Dict[str, Any]:
@@ -136,24 +181,40 @@ class CurrencyExchangePipeline:
         Returns:
             Dict com resultados da execução
         """
-        from datetime import datetime, timedelta
-        
         start_time = time.time()
         results = {'dates_processed': [], 'errors': []}
         
         try:
-            self.logger.info(f"Iniciando pipeline histórico de {start_date} a {end_date}")
+            self.logger.info("Iniciando pipeline histórico de %s a %s", start_date, end_date)
             
             # Converte strings para datetime
             start_dt = datetime.strptime(start_date, "%Y-%m-%d")
             end_dt = datetime.strptime(end_date, "%Y-%m-%d")
             
-            current_dt = start_dt
-            while current_dt <= end_dt:
-                date_str = current_dt.strftime("%Y-%m-%d")
+            dates = [
+                (start_dt + timedelta(days=i)).strftime("%Y-%m-%d")
+                for i in range((end_dt - start_dt).days + 1)
+            ]
+            
+            # Cada data é independente (arquivos próprios em todas as camadas): processa em paralelo,
+            # limitado a api_max_workers para respeitar as cotas da API de câmbio e do LLM
+            futures = {}
+            with ThreadPoolExecutor(max_workers=self.config.api_max_workers) as executor:
+                def _submit(date_str: str, bronze_file: Path):
+                    """Encadeia transform/load/LLM da data assim que sua ingestão termina."""
+                    futures[date_str] = executor.submit(self.run_daily_pipeline, date_str, bronze_file)
                 
+                # Ingestão em paralelo (limitada por rede) sobreposta às etapas seguintes das datas já baixadas
+                ingest_results = self.ingester.ingest_historical_rates(dates, on_ingested=_submit)
+                results['errors'].extend(ingest_results['errors'])
+            
+            # Resultados consolidados em ordem cronológica
+            for date_str in dates:
+                future = futures.get(date_str)
+                if future is None:
+                    continue
                 try:
-                    daily_results = self.run_daily_pipeline(date_str)
+                    daily_results = future.result()
                     if 'error' not in daily_results:
                         results['dates_processed'].append(date_str)
                     else:
@@ -167,17 +228,12 @@ class CurrencyExchangePipeline:
                         'date': date_str,
                         'error': str(e)
                     })
-                
-                current_dt += timedelta(days=1)
-                
-                # Pausa entre requests para não sobrecarregar APIs
-                time.sleep(1)
             
             execution_time = time.time() - start_time
             results['total_execution_time'] = execution_time
             
             self.logger.info(
-                f"Pipeline histórico concluído",
+                "Pipeline histórico concluído",
                 dates_processed=len(results['dates_processed']),
                 errors=len(results['errors']),
                 execution_time=execution_time
@@ -196,6 +252,83 @@ class CurrencyExchangePipeline:
             results['total_execution_time'] = execution_time
             return results
     
+    def run_historical_batched(self, start_date: str, end_date: str) -> Dict[str, Any]:
+        """
+        Backfill em lote: ingere todas as datas pela sessão HTTP compartilhada e grava
+        a silver histórica em um arquivo por mês, um row group por dia (sem gold/LLM por dia).
+        
+        Args:
+            start_date: Data inicial no formato YYYY-MM-DD
+            end_date: Data final no formato YYYY-MM-DD
+            
+        Returns:
+            Dict com resultados da execução
+        """
+        start_time = time.time()
+        results = {'dates_processed': [], 'errors': []}
+        
+        try:
+            self.logger.info("Iniciando backfill em lote de %s a %s", start_date, end_date)
+            
+            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+            end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+            dates = [
+                (start_dt + timedelta(days=i)).strftime("%Y-%m-%d")
+                for i in range((end_dt - start_dt).days + 1)
+            ]
+            
+            # Requisições em paralelo reaproveitando o pool keep-alive da sessão do ingester
+            ingest_results = self.ingester.ingest_historical_rates(dates)
+            results['errors'].extend(ingest_results['errors'])
+            bronze_files = {d: ingest_results['files'][d] for d in dates if d in ingest_results['files']}
+            
+            if bronze_files:
+                # Datas com bruto inválido entram em errors; as demais seguem gravadas
+                silver_results = self.transformer.transform_historical_data(bronze_files)
+                results['silver_dataset'] = silver_results['dataset_dir']
+                results['dates_processed'] = silver_results['dates']
+                results['errors'].extend(silver_results['errors'])
+            
+            execution_time = time.time() - start_time
+            results['total_execution_time'] = execution_time
+            
+            self.logger.info(
+                "Backfill em lote concluído",
+                dates_processed=len(results['dates_processed']),
+                errors=len(results['errors']),
+                execution_time=execution_time
+            )
+            
+            return results
+            
+        except Exception as e:
+            execution_time = time.time() - start_time
+            self.logger.error(
+                "Erro na execução do backfill em lote",
+                error=e,
+                execution_time=execution_time
+            )
+            results['fatal_error'] = str(e)
+            results['total_execution_time'] = execution_time
+            return results
+    
+    def wait(self):
+        """
+        Aguarda gravações em banco ainda pendentes, sem liberar recursos (o pipeline segue utilizável).
+        
+        Raises:
+            Exception: Primeiro erro ocorrido nas gravações em segundo plano
+        """
+        try:
+            self.loader.wait()
+        except Exception as e:
+            self.logger.error("Erro na gravação em banco de dados", error=e)
+            raise
+    
+    def close(self):
+        """Libera recursos do pipeline (referência ao cliente HTTP do LLM)."""
+        self.llm_analyzer.close()
+    
     def get_pipeline_status(self) -> Dict[str, Any]:
         """
         Retorna o status atual do pipeline.
@@ -213,12 +346,7 @@ class CurrencyExchangePipeline:
                     self.loader is not None,
                     self.llm_analyzer is not None
                 ]),
-                'data_paths': {
-                    'bronze': str(Path(self.config.data_paths['bronze']).exists()),
-                    'silver': str(Path(self.config.data_paths['silver']).exists()),
-                    'gold': str(Path(self.config.data_paths['gold']).exists()),
-                    'logs': str(Path(self.config.data_paths['logs']).exists())
-                }
+                'data_paths': {key: path.is_dir() for key, path in self._data_path_objs.items()}
             }
             
             return status
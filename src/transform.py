@@ -2,17 +2,63 @@
 Módulo de transformação e normalização de dados de cotações cambiais.
 """
 
-import json
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 
 from .config import Config
 from .logger import PipelineLogger
 
 
+# Colunas de texto da silver mantidas como strings Arrow
+STRING_COLUMNS = [
+    'date', 'timestamp', 'base_currency', 'target_currency', 'source',
+    'ingestion_timestamp', 'api_last_update'
+]
+
+# String Arrow com semântica NaN (padrão do pandas 3); versões antigas usam string[pyarrow]
+try:
+    ARROW_STRING_DTYPE = pd.StringDtype('pyarrow', na_value=np.nan)
+except TypeError:
+    ARROW_STRING_DTYPE = pd.StringDtype('pyarrow')
+
+# Colunas de baixa cardinalidade gravadas com codificação de dicionário na silver
+SILVER_DICTIONARY_COLUMNS = ['base_currency', 'target_currency', 'source', 'currency_category']
+
+# Categoria de cada moeda (desenvolvida, emergente); as demais são 'other'
+CURRENCY_CATEGORIES = {
+    'USD': 'major', 'EUR': 'major', 'GBP': 'major', 'JPY': 'major',
+    'CHF': 'major', 'CAD': 'major', 'AUD': 'major',
+    'BRL': 'emerging', 'MXN': 'emerging', 'ARS': 'emerging',
+    'CNY': 'emerging'
+}
+# Categorias fixas: a coluna guarda códigos int8 em vez de strings
+CURRENCY_CATEGORY_DTYPE = pd.CategoricalDtype(['major', 'emerging', 'other'])
+
+
+def _transform_day(config: Config, raw_file_path: Path, date_str: str) -> pa.Table:
+    """
+    Transforma um dia em um processo filho (nível de módulo para ser serializável).
+    
+    Args:
+        config: Configuração do projeto (o transformer é recriado no processo filho)
+        raw_file_path: Caminho para o arquivo de dados brutos
+        date_str: String da data (formato YYYY-MM-DD)
+        
+    Returns:
+        Tabela Arrow do dia
+    """
+    return ExchangeRateTransformer(config).transform_day_table(raw_file_path, date_str)
+
+
 class ExchangeRateTransformer:
     """Classe responsável pela transformação de dados de cotações cambiais."""
     
@@ -38,8 +84,9 @@ class ExchangeRateTransformer:
             Dict contendo os dados carregados
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # orjson: parse mais rápido dos ~170 floats do payload (bytes direto, sem decode)
+            with open(file_path, 'rb') as f:
+                data = orjson.loads(f.read())
             
             self.logger.info("Dados brutos carregados", file_path=str(file_path))
             return data
@@ -67,28 +114,37 @@ class ExchangeRateTransformer:
             conversion_rates = api_data.get('conversion_rates', {})
             last_update = api_data.get('time_last_update_utc')
             
-            # Cria lista de registros normalizados
-            records = []
-            
-            for target_currency, rate in conversion_rates.items():
-                # Filtra apenas as moedas de interesse se especificadas
-                if self.config.target_currencies and target_currency not in self.config.target_currencies:
-                    continue
-                
-                record = {
-                    'date': datetime.now().strftime('%Y-%m-%d'),
-                    'timestamp': datetime.now().isoformat(),
-                    'base_currency': base_currency,
-                    'target_currency': target_currency,
-                    'exchange_rate': float(rate),
-                    'source': 'exchangerate-api.com',
-                    'ingestion_timestamp': metadata.get('ingestion_timestamp'),
-                    'api_last_update': last_update
-                }
-                records.append(record)
-            
-            # Cria DataFrame
-            df = pd.DataFrame(records)
+            # Filtra apenas as moedas de interesse se especificadas: percorre as poucas moedas
+            # alvo (ordem da configuração) consultando o dict da API, em vez das ~170 moedas da API.
+            # As taxas vão direto do dict para um array float64 (fromiter, sem lista de tuplas)
+            targets = self.config.target_currencies
+            if targets:
+                currencies = [currency for currency in targets if currency in conversion_rates]
+                rates = np.fromiter((conversion_rates[c] for c in currencies), dtype=np.float64, count=len(currencies))
+            else:
+                currencies = list(conversion_rates)
+                rates = np.fromiter(conversion_rates.values(), dtype=np.float64, count=len(currencies))
+            
+            # Um único instante para todas as linhas (date e timestamp consistentes)
+            now_iso = datetime.now().isoformat()
+            
+            # Cria DataFrame direto das colunas; metadados escalares são replicados (broadcast)
+            df = pd.DataFrame({
+                'date': now_iso[:10],
+                'timestamp': now_iso,
+                'base_currency': base_currency,
+                'target_currency': currencies,
+                'exchange_rate': rates,
+                'source': 'exchangerate-api.com',
+                'ingestion_timestamp': metadata.get('ingestion_timestamp'),
+                'api_last_update': last_update
+            })
+            
+            # Strings Arrow (buffer contíguo + offsets) em vez de um objeto Python por célula.
+            # No pandas 3 esse já é o padrão (dtype str); só colunas que ficaram object são convertidas
+            object_columns = [c for c in STRING_COLUMNS if df[c].dtype == object]
+            if object_columns:
+                df = df.astype({c: ARROW_STRING_DTYPE for c in object_columns})
             
             self.logger.log_data_processing(
                 operation="normalize_exchange_rates",
@@ -114,21 +170,20 @@ class ExchangeRateTransformer:
         original_count = len(df)
         
         try:
-            # Remove registros com taxas nulas ou negativas
-            df = df.dropna(subset=['exchange_rate'])
-            df = df[df['exchange_rate'] > 0]
+            # normalize_exchange_rates já entrega float64: só converte se a coluna vier de outra origem
+            rate = df['exchange_rate']
+            if rate.dtype.kind != 'f':
+                rate = pd.to_numeric(rate, errors='coerce')
+                df = df.assign(exchange_rate=rate)
+            
+            # Todas as regras em uma única máscara (uma cópia só): taxas nulas (NaN falha nas
+            # comparações), negativas, ou fora da faixa plausível (podem indicar erro)
+            mask = (rate >= 0.0001) & (rate <= 1000000)
+            df = df.loc[mask]
             
             # Remove duplicatas
             df = df.drop_duplicates(subset=['base_currency', 'target_currency', 'date'])
             
-            # Valida tipos de dados
-            df['exchange_rate'] = pd.to_numeric(df['exchange_rate'], errors='coerce')
-            df = df.dropna(subset=['exchange_rate'])
-            
-            # Adiciona validações de negócio
-            # Taxa muito alta ou muito baixa pode indicar erro
-            df = df[(df['exchange_rate'] >= 0.0001) & (df['exchange_rate'] <= 1000000)]
-            
             cleaned_count = len(df)
             removed_count = original_count - cleaned_count
             
@@ -162,21 +217,23 @@ class ExchangeRateTransformer:
             DataFrame com campos adicionais
         """
         try:
-            # Adiciona taxa inversa (para conversão reversa)
-            df['inverse_rate'] = 1 / df['exchange_rate']
-            
-            # Adiciona categoria da moeda (desenvolvida, emergente, etc.)
-            currency_categories = {
-                'USD': 'major', 'EUR': 'major', 'GBP': 'major', 'JPY': 'major',
-                'CHF': 'major', 'CAD': 'major', 'AUD': 'major',
-                'BRL': 'emerging', 'MXN': 'emerging', 'ARS': 'emerging',
-                'CNY': 'emerging'
-            }
-            
-            df['currency_category'] = df['target_currency'].map(currency_categories).fillna('other')
-            
-            # Adiciona timestamp de processamento
-            df['processing_timestamp'] = datetime.now().isoformat()
+            # exchange_rate segue em float64: é o valor publicado (gold, banco, LLM) e moedas
+            # com taxa alta (IRR, VND, LBP) perderiam casas decimais em float32.
+            # Só a inversa, campo derivado, fica em float32 (metade da memória/tamanho no parquet)
+            rates = df['exchange_rate'].to_numpy(dtype=np.float64)
+            inverse32 = np.empty(len(rates), dtype=np.float32)
+            np.reciprocal(rates, out=inverse32, casting='same_kind')
+            
+            # Todas as colunas derivadas em um único assign (operações colunares vetorizadas):
+            # taxa inversa (para conversão reversa), categoria da moeda e timestamp de processamento.
+            # Colunas repetitivas viram category (menos memória e dicionário compacto no parquet)
+            df = df.assign(
+                inverse_rate=inverse32,
+                currency_category=df['target_currency'].map(CURRENCY_CATEGORIES).fillna('other').astype(CURRENCY_CATEGORY_DTYPE),
+                base_currency=df['base_currency'].astype('category'),
+                source=df['source'].astype('category'),
+                processing_timestamp=datetime.now().isoformat()
+            )
             
             self.logger.log_data_processing(
                 operation="add_calculated_fields",
@@ -212,8 +269,20 @@ class ExchangeRateTransformer:
         file_path = silver_dir / filename
         
         try:
-            # Salva em formato Parquet
-            df.to_parquet(file_path, index=False, engine='pyarrow')
+            # Salva em formato Parquet: conversão colunar direta para Arrow e compressão zstd.
+            # Um único row group (o arquivo diário é pequeno), dicionário nas colunas repetitivas
+            # e estatísticas por coluna para permitir pular row groups em leituras filtradas
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            pq.write_table(
+                table,
+                file_path,
+                compression='zstd',
+                compression_level=3,
+                use_dictionary=[c for c in SILVER_DICTIONARY_COLUMNS if c in table.column_names],
+                row_group_size=max(len(df), 1),
+                data_page_version='2.0',
+                write_statistics=True
+            )
             
             self.logger.log_data_processing(
                 operation="save_silver_data",
@@ -278,3 +347,197 @@ class ExchangeRateTransformer:
                 error=str(e)
             )
             raise
+    
+    def open_writer(self, path: Path, schema: pa.Schema) -> pq.ParquetWriter:
+        """
+        Abre um writer Parquet com as mesmas opções da silver diária.
+        
+        Args:
+            path: Caminho do arquivo a ser gravado
+            schema: Schema Arrow das tabelas que serão anexadas
+            
+        Returns:
+            ParquetWriter aberto (fechar com close())
+        """
+        return pq.ParquetWriter(
+            path,
+            schema,
+            compression='zstd',
+            compression_level=3,
+            use_dictionary=[c for c in SILVER_DICTIONARY_COLUMNS if c in schema.names],
+            data_page_version='2.0',
+            write_statistics=True
+        )
+    
+    def write_day(self, writer: pq.ParquetWriter, table: pa.Table) -> None:
+        """
+        Anexa os dados de um dia ao arquivo como um row group próprio.
+        
+        Args:
+            writer: Writer aberto por open_writer
+            table: Tabela Arrow do dia
+        """
+        writer.write_table(table.cast(writer.schema), row_group_size=max(table.num_rows, 1))
+    
+    def _read_month_days(self, file_path: Path) -> Dict[str, pa.Table]:
+        """
+        Lê os dias já gravados em um arquivo mensal (um row group por dia).
+        
+        Args:
+            file_path: Arquivo mensal da silver histórica
+            
+        Returns:
+            Dict data -> tabela Arrow do dia (vazio se o arquivo não existe)
+        """
+        if not file_path.exists():
+            return {}
+        days = {}
+        with pq.ParquetFile(file_path) as parquet_file:
+            for index in range(parquet_file.num_row_groups):
+                table = parquet_file.read_row_group(index)
+                days[table.column('date')[0].as_py()] = table
+        return days
+    
+    def transform_day_table(self, raw_file_path: Path, date_str: str) -> pa.Table:
+        """
+        Executa normalização, validação e enriquecimento de um dia e devolve a tabela Arrow.
+        
+        Args:
+            raw_file_path: Caminho para o arquivo de dados brutos
+            date_str: String da data (formato YYYY-MM-DD)
+            
+        Returns:
+            Tabela Arrow do dia, com a coluna date
+            
+        Raises:
+            ValueError: Se o arquivo bruto não traz as cotações da própria data
+        """
+        raw_data = self.load_raw_data(raw_file_path)
+        # Só arquivos buscados para a data (endpoint history) entram no histórico; um snapshot
+        # latest sem reference_date gravaria as cotações de hoje sob uma data passada
+        reference_date = raw_data.get('metadata', {}).get('reference_date')
+        if reference_date != date_str:
+            raise ValueError(
+                f"Arquivo bruto {raw_file_path} não contém cotações de {date_str} "
+                f"(reference_date={reference_date})"
+            )
+        
+        df = self.normalize_exchange_rates(raw_data)
+        df = self.add_calculated_fields(self.validate_data_quality(df))
+        # Data de referência das cotações, não a data de processamento
+        return pa.Table.from_pandas(df.assign(date=reference_date), preserve_index=False)
+    
+    def transform_historical_data(self, raw_files: Dict[str, Path], max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Transforma várias datas de uma vez e grava a silver histórica com um arquivo por mês.
+        
+        A transformação de cada dia (CPU) roda em um pool de processos, fora do GIL;
+        a gravação fica no processo principal, em ordem cronológica. Cada mês é gravado
+        por um único ParquetWriter, com um row group por dia: o footer é escrito uma vez
+        por arquivo e as estatísticas da coluna date permitem pular os dias fora do filtro.
+        
+        Uma data com arquivo bruto inválido é registrada em 'errors' e pulada. Cada mês tem
+        um arquivo de nome fixo: os dias reprocessados substituem os já gravados e os demais
+        são mantidos. O arquivo é montado em um caminho temporário e só substitui o anterior
+        depois que o writer fecha sem erro.
+        
+        Args:
+            raw_files: Dict data (YYYY-MM-DD) -> caminho do arquivo de dados brutos
+            max_workers: Processos de transformação (padrão: núcleos da máquina; 1 = sem pool)
+            
+        Returns:
+            Dict com 'dataset_dir' (Path da silver histórica), 'dates' (datas gravadas)
+            e 'errors' (lista de falhas por data)
+        """
+        start_time = time.time()
+        dataset_dir = Path(self.config.data_paths['silver']) / "historical"
+        dataset_dir.mkdir(parents=True, exist_ok=True)
+        results = {'dataset_dir': dataset_dir, 'dates': [], 'errors': []}
+        
+        dates = sorted(raw_files)
+        max_workers = min(max_workers or os.cpu_count() or 1, len(dates))
+        executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+        
+        try:
+            self.logger.log_pipeline_stage("transform_historical", "started", dates=len(raw_files))
+            
+            # Um future por data: a falha de um dia aparece só no result() daquele dia
+            if executor is not None:
+                futures = {d: executor.submit(_transform_day, self.config, raw_files[d], d) for d in dates}
+            
+            def _day_table(date_str: str) -> Optional[pa.Table]:
+                """Tabela do dia, ou None (com o erro registrado) se a transformação falhar."""
+                try:
+                    if executor is not None:
+                        return futures[date_str].result()
+                    return self.transform_day_table(raw_files[date_str], date_str)
+                except Exception as e:
+                    self.logger.error("Erro ao transformar data do histórico", error=e, date=date_str)
+                    results['errors'].append({'date': date_str, 'error': str(e)})
+                    return None
+            
+            # Datas agrupadas por mês (YYYY-MM), em ordem cronológica
+            months: Dict[str, List[str]] = {}
+            for date_str in dates:
+                months.setdefault(date_str[:7], []).append(date_str)
+            
+            records_processed = 0
+            for month, month_dates in months.items():
+                # Dias novos do mês (no máximo 31 tabelas pequenas em memória)
+                new_tables = {}
+                for date_str in month_dates:
+                    table = _day_table(date_str)
+                    if table is not None:
+                        new_tables[date_str] = table
+                        records_processed += table.num_rows
+                if not new_tables:
+                    continue
+                
+                # Nome fixo por mês: uma nova carga substitui os dias que reprocessa e
+                # preserva os demais dias já gravados no arquivo do mês
+                file_path = dataset_dir / f"exchange_rates_silver_{month}.parquet"
+                tables = self._read_month_days(file_path)
+                tables.update(new_tables)
+                
+                tmp_path = dataset_dir / f".exchange_rates_silver_{month}.parquet.tmp"
+                writer = None
+                try:
+                    for date_str in sorted(tables):
+                        if writer is None:
+                            writer = self.open_writer(tmp_path, tables[date_str].schema)
+                        self.write_day(writer, tables[date_str])
+                    writer.close()
+                    writer = None
+                except BaseException:
+                    if writer is not None:
+                        writer.close()
+                    tmp_path.unlink(missing_ok=True)
+                    raise
+                
+                tmp_path.replace(file_path)
+                results['dates'].extend(new_tables)
+            
+            duration = time.time() - start_time
+            self.logger.log_pipeline_stage(
+                "transform_historical",
+                "completed",
+                duration=duration,
+                file_path=str(dataset_dir),
+                records_processed=records_processed,
+                errors=len(results['errors'])
+            )
+            
+            return results
+            
+        except Exception as e:
+            duration = time.time() - start_time
+            self.logger.log_pipeline_stage(
+                "transform_historical",
+                "failed",
+                duration=duration,
+                error=str(e)
+            )
+            raise
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
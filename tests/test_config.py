@@ -79,6 +79,14 @@ class TestConfig:
         with pytest.raises(ValueError, match="EXCHANGE_RATE_API_KEY não encontrada"):
             config.validate_api_keys()
     
+    @patch.dict('os.environ', {'EXCHANGE_RATE_API_KEY': 'test_key'})
+    def test_get_full_api_url(self):
+        """Testa construção da URL completa da API."""
+        config = Config()
+        
+        assert config.get_full_api_url("latest/USD") == f"{config.api_base_url}/test_key/latest/USD"
+        assert config.get_full_api_url("latest/EUR") == f"{config.api_base_url}/test_key/latest/EUR"
+    
     def test_merge_configs(self):
         """Testa merge de configurações."""
         default = {
@@ -0,0 +1,125 @@
+"""
+Testes para o módulo de ingestão.
+"""
+
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+
+from src.ingest import ExchangeRateIngester, RateLimiter
+
+
+@pytest.fixture
+def api_data():
+    """Resposta simulada da API de câmbio."""
+    return {
+        'result': 'success',
+        'base_code': 'USD',
+        'time_last_update_utc': 'Mon, 15 Jan 2024 00:00:01 +0000',
+        'conversion_rates': {'USD': 1, 'BRL': 4.9123, 'EUR': 0.9132, 'JPY': 146.5}
+    }
+
+
+@pytest.fixture
+def ingester(tmp_path):
+    """Ingester com configuração simulada apontando para diretório temporário."""
+    config = MagicMock()
+    config.data_paths = {'raw': str(tmp_path / 'raw')}
+    config.api_timeout = 30
+    config.api_max_workers = 4
+    config.api_rate_limit_rps = 0
+    return ExchangeRateIngester(config)
+
+
+class TestExchangeRateIngester:
+    """Testes para a classe ExchangeRateIngester."""
+
+    def test_fetch_exchange_rates_uses_timeout(self, ingester, api_data):
+        """Testa que o timeout configurado é passado em cada requisição."""
+        ingester.config.get_full_api_url.return_value = "https://api.test/key/latest/USD"
+        response = MagicMock(status_code=200)
+        response.json.return_value = api_data
+        ingester.session.get = MagicMock(return_value=response)
+
+        data = ingester.fetch_exchange_rates("USD")
+
+        assert data == api_data
+        ingester.session.get.assert_called_once_with("https://api.test/key/latest/USD", timeout=30)
+
+    def test_ingest_historical_rates_requests_each_date(self, ingester, api_data):
+        """Testa que cada data do histórico gera sua própria URL (endpoint history) e arquivo."""
+        ingester.config.base_currency = 'USD'
+        ingester.config.get_full_api_url.side_effect = lambda endpoint: f"https://api.test/key/{endpoint}"
+        response = MagicMock(status_code=200)
+        response.json.return_value = api_data
+        ingester.session.get = MagicMock(return_value=response)
+
+        results = ingester.ingest_historical_rates(["2024-01-15", "2024-01-16"])
+
+        urls = sorted(c.args[0] for c in ingester.session.get.call_args_list)
+        assert urls == [
+            "https://api.test/key/history/USD/2024/1/15",
+            "https://api.test/key/history/USD/2024/1/16",
+        ]
+        assert results['errors'] == []
+        saved = json.loads(results['files']["2024-01-16"].read_text(encoding='utf-8'))
+        assert saved['metadata']['reference_date'] == "2024-01-16"
+
+    @pytest.mark.parametrize("bad_rate", [0, -1.5, float('nan'), float('inf'), "4.9", None])
+    def test_validate_api_response_invalid_rate(self, ingester, api_data, bad_rate):
+        """Testa rejeição de taxas não numéricas, não finitas ou não positivas."""
+        api_data['conversion_rates']['BRL'] = bad_rate
+
+        with pytest.raises(ValueError, match="Taxa inválida para BRL"):
+            ingester._validate_api_response(api_data)
+
+    def test_validate_api_response_success(self, ingester, api_data):
+        """Testa validação de resposta correta da API."""
+        ingester._validate_api_response(api_data)
+
+    def test_save_raw_data(self, ingester, api_data):
+        """Testa gravação dos dados brutos com metadados."""
+        file_path = ingester.save_raw_data(api_data, "2024-01-15")
+
+        assert file_path.name == "exchange_rates_2024-01-15.json"
+        with open(file_path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+
+        assert saved['raw_data'] == api_data
+        assert saved['metadata']['base_currency'] == 'USD'
+        assert saved['metadata']['currencies_count'] == 4
+
+
+
+class TestRateLimiter:
+    """Testes para o limitador de requisições (token bucket)."""
+
+    def test_burst_then_waits_for_refill(self):
+        """Testa que a rajada inicial passa direto e a requisição seguinte aguarda só o necessário."""
+        clock = [100.0]
+        with patch('src.ingest.time.monotonic', side_effect=lambda: clock[0]), \
+             patch('src.ingest.time.sleep', side_effect=lambda s: clock.__setitem__(0, clock[0] + s)) as sleep:
+            limiter = RateLimiter(2)
+            limiter.acquire()
+            limiter.acquire()
+            sleep.assert_not_called()
+
+            limiter.acquire()
+            sleep.assert_called_once_with(pytest.approx(0.5))
+
+
+    def test_fractional_rate_does_not_block_forever(self):
+        """Testa que rate < 1 libera uma requisição a cada 1/rate segundos em vez de travar."""
+        clock = [100.0]
+        with patch('src.ingest.time.monotonic', side_effect=lambda: clock[0]), \
+             patch('src.ingest.time.sleep', side_effect=lambda s: clock.__setitem__(0, clock[0] + s)) as sleep:
+            limiter = RateLimiter(0.5)
+            limiter.acquire()
+            sleep.assert_not_called()
+
+            limiter.acquire()
+            sleep.assert_called_once_with(pytest.approx(2.0))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,113 @@
+"""
+Testes para o módulo de análise com LLM.
+"""
+
+import json
+import pandas as pd
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src import llm_analyzer
+from src.llm_analyzer import LLMAnalyzer, _LLMCache
+
+
+@pytest.fixture
+def gold_df():
+    """Dados gold simulados."""
+    return pd.DataFrame({
+        'base_currency': ['USD', 'USD', 'USD'],
+        'target_currency': ['BRL', 'EUR', 'JPY'],
+        'currency_category': ['emerging', 'major', 'major'],
+        'latest_rate': [4.91234, 0.91321, 146.5],
+        'min_rate': [4.9, 0.91, 146.0],
+        'max_rate': [4.95, 0.92, 147.0],
+        'avg_rate': [4.92, 0.915, 146.5],
+        'volatility': [0.012, 0.004, 0.02],
+    })
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    """Analisador com cliente OpenAI simulado e pasta gold temporária."""
+    config = MagicMock()
+    config.data_paths = {'gold': str(tmp_path / 'gold')}
+    config.llm_config = {'model': 'gpt-test', 'max_tokens': 100, 'temperature': 0.3}
+
+    with patch('openai.OpenAI') as mock_openai:
+        client = mock_openai.return_value
+        response = MagicMock()
+        response.choices[0].message.content = "resposta do LLM"
+        response.usage.total_tokens = 42
+        client.chat.completions.create.return_value = response
+        analyzer = LLMAnalyzer(config)
+        yield analyzer
+        analyzer.close()
+
+
+class TestLLMAnalyzer:
+    """Testes para a classe LLMAnalyzer."""
+
+    def test_prepare_data_summary(self, analyzer, gold_df):
+        """Testa resumo ordenado por volatilidade com valores arredondados."""
+        summary = analyzer.prepare_data_summary(gold_df)
+
+        assert "Moeda Base: USD" in summary
+        assert "Total de Moedas Analisadas: 3" in summary
+        assert summary.index("JPY (MAJOR)") < summary.index("BRL (EMERGING)") < summary.index("EUR (MAJOR)")
+        assert "- Taxa Atual: 4.9123" in summary
+        assert "- Volatilidade: 1.2%" in summary
+
+    def test_prepare_data_summary_truncates_to_top_n(self, analyzer, gold_df):
+        """Testa que só as top_n moedas são detalhadas e as demais viram linha agregada."""
+        summary = analyzer.prepare_data_summary(gold_df, top_n=2)
+
+        assert "Total de Moedas Analisadas: 3" in summary
+        assert "EUR (MAJOR)" not in summary
+        assert "DEMAIS MOEDAS (1 com menor volatilidade)" in summary
+        assert "- Mais estáveis: EUR (0.4%)" in summary
+
+    def test_analyze_daily_data(self, analyzer, gold_df, tmp_path):
+        """Testa análise completa: duas chamadas ao LLM e relatório salvo."""
+        gold_file = tmp_path / "exchange_rates_gold_2024-01-15.parquet"
+        gold_df.to_parquet(gold_file, index=False)
+
+        result = analyzer.analyze_daily_data(gold_file, "2024-01-15")
+
+        assert analyzer.client.chat.completions.create.call_count == 2
+        assert result['report_json'].name == "llm_insights_2024-01-15.json"
+        assert result['report_txt'].exists()
+        with open(result['report_json'], 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        assert report['business_insights'] == "resposta do LLM"
+        assert report['currency_explanation'] == "resposta do LLM"
+        assert report['metadata']['model_used'] == "gpt-test"
+
+    def test_cached_complete_reuses_response(self, analyzer, tmp_path):
+        """Testa que prompts idênticos com cache habilitado não repetem a chamada à API."""
+        analyzer.cache = _LLMCache(tmp_path / 'cache')
+
+        first = analyzer._cached_complete("sistema", "prompt")
+        second = analyzer._cached_complete("sistema", "prompt")
+
+        assert first == second == "resposta do LLM"
+        assert analyzer.client.chat.completions.create.call_count == 1
+        analyzer._cached_complete("sistema", "outro prompt")
+        assert analyzer.client.chat.completions.create.call_count == 2
+
+
+    def test_shared_http_client_outlives_other_analyzers(self, analyzer):
+        """Testa que fechar um analisador não fecha o cliente HTTP ainda usado por outro."""
+        with patch('openai.OpenAI'):
+            other = LLMAnalyzer(analyzer.config)
+        http_client = llm_analyzer._shared_http_client
+
+        other.close()
+        other.close()
+        assert not http_client.is_closed
+
+        analyzer.close()
+        assert http_client.is_closed
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,44 @@
+"""
+Testes para o módulo de logging estruturado.
+"""
+
+import logging
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.logger import PipelineLogger
+
+
+@pytest.fixture
+def root_level():
+    """Restaura o nível do logger raiz ao final do teste."""
+    root = logging.getLogger()
+    level = root.level
+    yield root
+    root.setLevel(level)
+
+
+class TestPipelineLogger:
+    """Testes para a classe PipelineLogger."""
+
+    def test_level_change_after_creation_is_respected(self, root_level):
+        """Testa que o nível é consultado a cada chamada, não congelado na criação do logger."""
+        bound = MagicMock()
+        with patch('src.logger.structlog.is_configured', return_value=True):
+            root_level.setLevel(logging.WARNING)
+            logger = PipelineLogger("test", MagicMock(bind=MagicMock(return_value=bound)))
+
+            logger.log_data_processing("op", 10)
+            logger.info("Iniciando %s", "2024-01-15")
+            bound.info.assert_not_called()
+
+            root_level.setLevel(logging.INFO)
+            logger.log_data_processing("op", 10)
+            logger.info("Iniciando %s", "2024-01-15")
+
+        assert bound.info.call_count == 2
+        assert bound.info.call_args.args == ("Iniciando 2024-01-15",)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -54,6 +54,27 @@ class TestCurrencyExchangePipeline:
             assert result is True
             mock_config_instance.validate_api_keys.assert_called_once()
     
+    @patch('src.pipeline.Config')
+    def test_validate_setup_is_memoized(self, mock_config):
+        """Testa que validações seguidas reaproveitam o resultado até invalidar."""
+        mock_config_instance = MagicMock()
+        mock_config.return_value = mock_config_instance
+        
+        with patch('src.pipeline.setup_logging'), \
+             patch('src.pipeline.ExchangeRateIngester'), \
+             patch('src.pipeline.ExchangeRateTransformer'), \
+             patch('src.pipeline.ExchangeRateLoader'), \
+             patch('src.pipeline.LLMAnalyzer'):
+            
+            pipeline = CurrencyExchangePipeline()
+            assert pipeline.validate_setup() is True
+            assert pipeline.get_pipeline_status()['pipeline_ready'] is True
+            mock_config_instance.validate_api_keys.assert_called_once()
+            
+            pipeline.invalidate_validation()
+            pipeline.validate_setup()
+            assert mock_config_instance.validate_api_keys.call_count == 2
+    
     @patch('src.pipeline.Config')
     def test_validate_setup_failure(self, mock_config):
         """Testa falha na validação do setup."""
@@ -115,6 +136,108 @@ class TestCurrencyExchangePipeline:
             assert result['llm_analysis'] == {"insight": "test"}
             assert 'execution_time' in result
 
+    @patch('src.pipeline.Config')
+    def test_run_historical_pipeline_bulk_ingest(self, mock_config):
+        """Testa pipeline histórico com ingestão em lote e falha de ingestão em uma data."""
+        mock_config.return_value = MagicMock(api_max_workers=2)
+
+        def fake_ingest(dates, on_ingested=None):
+            files = {"2024-01-03": "bronze_03.json", "2024-01-01": "bronze_01.json"}
+            for date_str, file_path in files.items():
+                on_ingested(date_str, file_path)
+            return {'files': files, 'errors': [{'date': "2024-01-02", 'error': "timeout"}]}
+
+        mock_ingester = MagicMock()
+        mock_ingester.ingest_historical_rates.side_effect = fake_ingest
+        mock_transformer = MagicMock()
+        mock_transformer.transform_daily_data.return_value = "silver_file.parquet"
+        mock_loader = MagicMock()
+        mock_loader.load_daily_data.return_value = "gold_file.parquet"
+
+        with patch('src.pipeline.setup_logging'), \
+             patch('src.pipeline.ExchangeRateIngester', return_value=mock_ingester), \
+             patch('src.pipeline.ExchangeRateTransformer', return_value=mock_transformer), \
+             patch('src.pipeline.ExchangeRateLoader', return_value=mock_loader), \
+             patch('src.pipeline.LLMAnalyzer'):
+
+            pipeline = CurrencyExchangePipeline()
+            result = pipeline.run_historical_pipeline("2024-01-01", "2024-01-03")
+
+            mock_ingester.ingest_historical_rates.assert_called_once()
+            assert mock_ingester.ingest_historical_rates.call_args.args[0] == [
+                "2024-01-01", "2024-01-02", "2024-01-03"
+            ]
+            mock_ingester.ingest_daily_rates.assert_not_called()
+            mock_transformer.transform_daily_data.assert_any_call("bronze_01.json", "2024-01-01")
+            mock_transformer.transform_daily_data.assert_any_call("bronze_03.json", "2024-01-03")
+
+            assert result['dates_processed'] == ["2024-01-01", "2024-01-03"]
+            assert result['errors'] == [{'date': "2024-01-02", 'error': "timeout"}]
+
+
+    @patch('src.pipeline.Config')
+    def test_run_historical_pipeline_attributes_db_errors_to_date(self, mock_config):
+        """Testa que a falha da gravação em banco de uma data vira erro daquela data."""
+        mock_config.return_value = MagicMock(api_max_workers=2)
+
+        def fake_ingest(dates, on_ingested=None):
+            files = {d: f"bronze_{d}.json" for d in dates}
+            for date_str, file_path in files.items():
+                on_ingested(date_str, file_path)
+            return {'files': files, 'errors': []}
+
+        def fake_wait(date_str=None):
+            if date_str == "2024-01-02":
+                raise RuntimeError("db offline")
+
+        mock_ingester = MagicMock()
+        mock_ingester.ingest_historical_rates.side_effect = fake_ingest
+        mock_loader = MagicMock()
+        mock_loader.wait.side_effect = fake_wait
+
+        with patch('src.pipeline.setup_logging'), \
+             patch('src.pipeline.ExchangeRateIngester', return_value=mock_ingester), \
+             patch('src.pipeline.ExchangeRateTransformer'), \
+             patch('src.pipeline.ExchangeRateLoader', return_value=mock_loader), \
+             patch('src.pipeline.LLMAnalyzer'):
+
+            pipeline = CurrencyExchangePipeline()
+            result = pipeline.run_historical_pipeline("2024-01-01", "2024-01-02")
+
+            assert result['dates_processed'] == ["2024-01-01"]
+            assert result['errors'] == [{'date': "2024-01-02", 'error': "db offline"}]
+
+    @patch('src.pipeline.Config')
+    def test_run_historical_batched_reports_day_errors(self, mock_config):
+        """Testa backfill em lote com falha de transformação em uma data e as demais gravadas."""
+        mock_config.return_value = MagicMock(api_max_workers=2)
+
+        mock_ingester = MagicMock()
+        mock_ingester.ingest_historical_rates.return_value = {
+            'files': {"2024-01-01": "bronze_01.json", "2024-01-02": "bronze_02.json"},
+            'errors': []
+        }
+        mock_transformer = MagicMock()
+        mock_transformer.transform_historical_data.return_value = {
+            'dataset_dir': "silver/historical",
+            'dates': ["2024-01-01"],
+            'errors': [{'date': "2024-01-02", 'error': "JSON inválido"}]
+        }
+
+        with patch('src.pipeline.setup_logging'), \
+             patch('src.pipeline.ExchangeRateIngester', return_value=mock_ingester), \
+             patch('src.pipeline.ExchangeRateTransformer', return_value=mock_transformer), \
+             patch('src.pipeline.ExchangeRateLoader'), \
+             patch('src.pipeline.LLMAnalyzer'):
+
+            pipeline = CurrencyExchangePipeline()
+            result = pipeline.run_historical_batched("2024-01-01", "2024-01-02")
+
+            assert 'fatal_error' not in result
+            assert result['silver_dataset'] == "silver/historical"
+            assert result['dates_processed'] == ["2024-01-01"]
+            assert result['errors'] == [{'date': "2024-01-02", 'error': "JSON inválido"}]
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,165 @@
+"""
+Testes para o módulo de transformação (camada silver).
+"""
+
+import json
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from types import SimpleNamespace
+
+from src.transform import ExchangeRateTransformer
+
+
+@pytest.fixture
+def raw_data():
+    """Arquivo bruto simulado (metadados + resposta da API)."""
+    return {
+        'metadata': {'ingestion_timestamp': '2024-01-15T00:00:00'},
+        'raw_data': {
+            'result': 'success',
+            'base_code': 'USD',
+            'time_last_update_utc': 'Mon, 15 Jan 2024 00:00:01 +0000',
+            'conversion_rates': {'USD': 1, 'BRL': 4.9123, 'EUR': 0.9132, 'JPY': 146.5}
+        }
+    }
+
+
+@pytest.fixture
+def transformer(tmp_path):
+    """Transformer com configuração simulada (serializável, para o pool de processos) filtrando algumas moedas."""
+    config = SimpleNamespace(
+        target_currencies=['BRL', 'EUR'],
+        data_paths={'silver': str(tmp_path / 'silver')}
+    )
+    return ExchangeRateTransformer(config)
+
+
+class TestExchangeRateTransformer:
+    """Testes para a classe ExchangeRateTransformer."""
+
+    def test_normalize_exchange_rates(self, transformer, raw_data):
+        """Testa normalização apenas das moedas alvo com metadados replicados."""
+        df = transformer.normalize_exchange_rates(raw_data)
+
+        assert list(df['target_currency']) == ['BRL', 'EUR']
+        assert list(df['exchange_rate']) == [4.9123, 0.9132]
+        assert (df['base_currency'] == 'USD').all()
+        assert (df['ingestion_timestamp'] == '2024-01-15T00:00:00').all()
+        assert df['timestamp'].nunique() == 1
+        assert df['date'].iloc[0] == df['timestamp'].iloc[0][:10]
+
+
+    def test_validate_data_quality(self, transformer):
+        """Testa remoção de taxas inválidas/fora da faixa e de duplicatas."""
+        df = pd.DataFrame({
+            'date': ['2024-01-15'] * 6,
+            'base_currency': ['USD'] * 6,
+            'target_currency': ['BRL', 'BRL', 'EUR', 'JPY', 'ARS', 'XXX'],
+            'exchange_rate': [4.9, 4.95, None, -1.0, 2e6, 0.00001],
+        })
+
+        cleaned = transformer.validate_data_quality(df)
+
+        assert list(cleaned['target_currency']) == ['BRL']
+        assert list(cleaned['exchange_rate']) == [4.9]
+
+
+    def test_transform_daily_data(self, transformer, raw_data, tmp_path):
+        """Testa fluxo completo: arquivo bruto -> parquet silver com campos calculados."""
+        raw_file = tmp_path / "exchange_rates_2024-01-15.json"
+        raw_file.write_text(json.dumps(raw_data), encoding='utf-8')
+
+        silver_file = transformer.transform_daily_data(raw_file, "2024-01-15")
+
+        assert silver_file.name == "exchange_rates_silver_2024-01-15.parquet"
+        df = pd.read_parquet(silver_file).set_index('target_currency')
+        # Taxa publicada sem perda de precisão (float64); só a inversa é float32
+        assert df['exchange_rate'].dtype == 'float64'
+        assert df.loc['BRL', 'exchange_rate'] == 4.9123
+        assert df.loc['BRL', 'inverse_rate'] == pytest.approx(1 / 4.9123)
+        assert df.loc['BRL', 'currency_category'] == 'emerging'
+        assert df.loc['EUR', 'currency_category'] == 'major'
+        assert list(df['currency_category'].cat.categories) == ['major', 'emerging', 'other']
+
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_transform_historical_data(self, transformer, raw_data, tmp_path, max_workers):
+        """Testa gravação de várias datas em um arquivo por mês com um row group por dia."""
+        raw_files = {}
+        for date_str in ["2024-01-31", "2024-01-30", "2024-02-01"]:
+            raw_files[date_str] = tmp_path / f"exchange_rates_{date_str}.json"
+            raw_data['metadata']['reference_date'] = date_str
+            raw_files[date_str].write_text(json.dumps(raw_data), encoding='utf-8')
+
+        result = transformer.transform_historical_data(raw_files, max_workers=max_workers)
+        dataset_dir = result['dataset_dir']
+
+        assert result['dates'] == ["2024-01-30", "2024-01-31", "2024-02-01"]
+        assert result['errors'] == []
+
+        assert sorted(p.name for p in dataset_dir.iterdir()) == [
+            "exchange_rates_silver_2024-01.parquet",
+            "exchange_rates_silver_2024-02.parquet",
+        ]
+        january = pq.ParquetFile(dataset_dir / "exchange_rates_silver_2024-01.parquet")
+        assert january.metadata.num_row_groups == 2
+        df = pd.read_parquet(dataset_dir)
+        assert len(df) == 6
+        assert sorted(df['date'].astype(str).unique()) == ["2024-01-30", "2024-01-31", "2024-02-01"]
+
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_transform_historical_data_skips_bad_day(self, transformer, raw_data, tmp_path, max_workers):
+        """Testa que um bruto inválido vira erro da data e o arquivo do mês leva só as datas gravadas."""
+        raw_files = {}
+        for date_str in ["2024-01-09", "2024-01-10", "2024-01-11"]:
+            raw_files[date_str] = tmp_path / f"exchange_rates_{date_str}.json"
+            raw_data['metadata']['reference_date'] = date_str
+            raw_files[date_str].write_text(json.dumps(raw_data), encoding='utf-8')
+        raw_files["2024-01-10"].write_text("{corrompido", encoding='utf-8')
+
+        result = transformer.transform_historical_data(raw_files, max_workers=max_workers)
+
+        assert result['dates'] == ["2024-01-09", "2024-01-11"]
+        assert [error['date'] for error in result['errors']] == ["2024-01-10"]
+        assert [p.name for p in result['dataset_dir'].iterdir()] == ["exchange_rates_silver_2024-01.parquet"]
+        assert pq.ParquetFile(result['dataset_dir'] / "exchange_rates_silver_2024-01.parquet").metadata.num_row_groups == 2
+
+
+    def test_transform_historical_data_overlapping_runs_merge_month(self, transformer, raw_data, tmp_path):
+        """Testa que backfills sobrepostos do mesmo mês substituem os dias repetidos sem duplicá-los."""
+        def write_raw(date_str, brl_rate):
+            raw_data['metadata']['reference_date'] = date_str
+            raw_data['raw_data']['conversion_rates']['BRL'] = brl_rate
+            raw_file = tmp_path / f"exchange_rates_{date_str}.json"
+            raw_file.write_text(json.dumps(raw_data), encoding='utf-8')
+            return raw_file
+
+        transformer.transform_historical_data(
+            {d: write_raw(d, 4.9) for d in ["2024-01-01", "2024-01-02", "2024-01-03"]}, max_workers=1
+        )
+        result = transformer.transform_historical_data(
+            {d: write_raw(d, 5.1) for d in ["2024-01-03", "2024-01-04"]}, max_workers=1
+        )
+
+        assert [p.name for p in result['dataset_dir'].iterdir()] == ["exchange_rates_silver_2024-01.parquet"]
+        df = pd.read_parquet(result['dataset_dir'])
+        brl = df[df['target_currency'] == 'BRL'].set_index('date')['exchange_rate']
+        assert list(brl.index) == ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"]
+        assert list(brl) == [4.9, 4.9, 5.1, 5.1]
+
+    def test_transform_historical_data_rejects_latest_snapshot(self, transformer, raw_data, tmp_path):
+        """Testa que um bruto sem reference_date (snapshot latest) não é gravado como histórico."""
+        raw_file = tmp_path / "exchange_rates_2024-01-10.json"
+        raw_file.write_text(json.dumps(raw_data), encoding='utf-8')
+
+        result = transformer.transform_historical_data({"2024-01-10": raw_file}, max_workers=1)
+
+        assert result['dates'] == []
+        assert "reference_date=None" in result['errors'][0]['error']
+        assert list(result['dataset_dir'].iterdir()) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])